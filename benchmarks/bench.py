@@ -0,0 +1,395 @@
+import sys
+import os
+import json
+import time
+import shutil
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import argparse
+import gc
+import tracemalloc
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEventLoop, QTimer, pyqtSignal
+from core import APP_VERSION, CatalogCache, MediaCache, SizeCache, Downloader, parse_programs_data
+from gui import DataLoader, IconLoader, SizeService, DownloadThread
+
+DEFAULT_CATALOGS = (100, 1000, 10000, 100000)
+SCENARIO_TIMEOUT = 600
+
+class ResourceMonitor:
+    INTERVAL = 0.05
+
+    def __init__(self):
+        self.stop_event = threading.Event()
+        self.peak_rss = 0
+
+    @staticmethod
+    def current_rss():
+        try:
+            with open('/proc/self/statm', 'r') as file:
+                return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            import resource
+            scale = 1 if sys.platform == 'darwin' else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def sample(self):
+        while not self.stop_event.wait(self.INTERVAL):
+            self.peak_rss = max(self.peak_rss, self.current_rss())
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.current_rss()
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop_event.set()
+        self.thread.join()
+        self.peak_rss = max(self.peak_rss, self.current_rss())
+        self.wall = time.perf_counter() - self.started
+        self.cpu = time.process_time() - self.cpu_started
+
+    def metrics(self):
+        return {
+            'wall_s': round(self.wall, 4),
+            'cpu_s': round(self.cpu, 4),
+            'peak_rss_mb': round(self.peak_rss / (1024 * 1024), 1),
+            'rss_growth_mb': round((self.peak_rss - self.start_rss) / (1024 * 1024), 1),
+        }
+
+class StandInProcess:
+    def __init__(self, latency_ms=0, bandwidth_kb=0, error_rate=0, seed=0):
+        self.command = [sys.executable, str(Path(__file__).with_name('server.py')),
+                        '--latency-ms', str(latency_ms), '--bandwidth-kb', str(bandwidth_kb),
+                        '--error-rate', str(error_rate), '--seed', str(seed)]
+
+    def __enter__(self):
+        self.process = subprocess.Popen(self.command, stdout=subprocess.PIPE, text=True)
+        self.base_url = self.process.stdout.readline().strip()
+        if not self.base_url:
+            self.process.kill()
+            raise RuntimeError("Сервер-заглушка не запустился")
+        return self
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait()
+
+def wait_for(signals, timeout=SCENARIO_TIMEOUT):
+    loop = QEventLoop()
+    for signal in signals:
+        signal.connect(loop.quit)
+    timer = QTimer()
+    timer.setSingleShot(True)
+    timer.timeout.connect(loop.quit)
+    timer.start(int(timeout * 1000))
+    loop.exec_()
+    if not timer.isActive():
+        raise TimeoutError(f"Сценарий не уложился в {timeout} с")
+    timer.stop()
+
+class Completion(QObject):
+    finished = pyqtSignal()
+
+    def __init__(self, expected):
+        super().__init__()
+        self.expected = expected
+        self.done = 0
+        self.failed = 0
+
+    def succeeded(self, *args):
+        self.count()
+
+    def failure(self, *args):
+        self.failed += 1
+        self.count()
+
+    def count(self):
+        self.done += 1
+        if self.done == self.expected:
+            self.finished.emit()
+
+def bench_catalog(base_url, workdir, apps):
+    loader = DataLoader(f"{base_url}/catalog/{apps}.json", show_cached=False, stream_rows=True,
+                        cache=CatalogCache(workdir))
+    marks = {}
+    result = {}
+    loader.rows_parsed.connect(lambda batch: marks.setdefault('first_row', time.perf_counter()))
+    loader.data_loaded.connect(lambda data: (marks.setdefault('loaded', time.perf_counter()),
+                                             result.setdefault('rows', len(data))))
+    loader.load_failed.connect(lambda error_msg: result.setdefault('error', error_msg))
+
+    with ResourceMonitor() as monitor:
+        started = time.perf_counter()
+        loader.start()
+        wait_for([loader.finished])
+    loader.wait()
+
+    metrics = monitor.metrics()
+    if 'loaded' in marks:
+        metrics['catalog_load_s'] = round(marks['loaded'] - started, 4)
+    if 'first_row' in marks:
+        metrics['first_row_s'] = round(marks['first_row'] - started, 4)
+    metrics.update(result)
+    return metrics
+
+def bench_media(base_url, workdir, kind, count):
+    variant = 'icon48' if kind == 'icon' else 'screenshot'
+    loader = IconLoader(variant, cache=MediaCache(workdir / "media"), use_pixmap_cache=False)
+    completion = Completion(count)
+    loader.icon_ready.connect(completion.succeeded)
+    loader.icon_failed.connect(completion.failure)
+
+    with ResourceMonitor() as monitor:
+        for i in range(count):
+            url = f"{base_url}/{kind}/{i}.png"
+            loader.request(url, url)
+        wait_for([completion.finished])
+    loader.cancel_all()
+    loader.pool.waitForDone()
+
+    metrics = monitor.metrics()
+    metrics[f"{kind}s_per_s"] = round((completion.done - completion.failed) / monitor.wall, 2)
+    metrics['failed'] = completion.failed
+    return metrics
+
+def bench_sizes(base_url, workdir, count):
+    service = SizeService(cache=SizeCache(workdir))
+    completion = Completion(count)
+    service.size_ready.connect(completion.succeeded)
+    service.size_failed.connect(completion.failure)
+
+    with ResourceMonitor() as monitor:
+        for i in range(count):
+            service.request(f"{base_url}/artifact/{1024 * 1024 + i * 4096}.bin")
+        wait_for([completion.finished])
+    service.shutdown()
+    service.pool.waitForDone()
+
+    metrics = monitor.metrics()
+    metrics['sizes_per_s'] = round((completion.done - completion.failed) / monitor.wall, 2)
+    metrics['failed'] = completion.failed
+    return metrics
+
+def bench_download(base_url, workdir, size_mb, segments):
+    size = size_mb * 1024 * 1024
+    save_path = str(workdir / "artifact.bin")
+    thread = DownloadThread(f"{base_url}/artifact/{size}.bin", save_path, segments, expected_size=size)
+    result = {}
+    thread.download_finished.connect(lambda path: result.setdefault('size', os.path.getsize(path)))
+    thread.download_error.connect(lambda error_msg: result.setdefault('error', error_msg))
+
+    with ResourceMonitor() as monitor:
+        thread.start()
+        wait_for([thread.finished])
+    thread.wait()
+
+    metrics = monitor.metrics()
+    if 'size' in result:
+        metrics['download_mb_per_s'] = round(result['size'] / (1024 * 1024) / monitor.wall, 2)
+    metrics.update(result)
+    return metrics
+
+def retained_mb(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        _ = build()  # held so the result is still alive when measured
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return round(retained / (1024 * 1024), 2)
+
+def bench_catalog_memory(base_url, apps):
+    with urllib.request.urlopen(f"{base_url}/catalog/{apps}.json") as response:
+        text = response.read().decode('utf-8')
+
+    metrics = {'rows': apps}
+    started = time.perf_counter()
+    dicts = json.loads(text)['programs']
+    metrics['parse_dicts_s'] = round(time.perf_counter() - started, 4)
+    del dicts
+    started = time.perf_counter()
+    entries = parse_programs_data(json.loads(text))
+    metrics['parse_entries_s'] = round(time.perf_counter() - started, 4)
+    del entries
+
+    metrics['dicts_mb'] = retained_mb(lambda: json.loads(text)['programs'])
+    metrics['entries_mb'] = retained_mb(lambda: parse_programs_data(json.loads(text)))
+    if metrics['entries_mb']:
+        metrics['dicts_to_entries'] = round(metrics['dicts_mb'] / metrics['entries_mb'], 2)
+    return metrics
+
+def median_metrics(runs):
+    merged = {}
+    for name in dict.fromkeys(name for run in runs for name in run):
+        values = [run[name] for run in runs if name in run]
+        if all(isinstance(value, int) for value in values):
+            merged[name] = statistics.median_low(values)
+        elif all(isinstance(value, (int, float)) for value in values):
+            merged[name] = round(statistics.median(values), 4)
+        else:
+            merged[name] = values[-1]
+    if len(runs) > 1:
+        merged['runs'] = len(runs)
+    return merged
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def scenarios(args):
+    for apps in args.catalogs:
+        yield f"catalog_{apps}", lambda base_url, workdir, apps=apps: bench_catalog(base_url, workdir, apps)
+    if args.memory_apps:
+        yield 'catalog_memory', lambda base_url, workdir: bench_catalog_memory(base_url, args.memory_apps)
+    if args.icons:
+        yield 'icons', lambda base_url, workdir: bench_media(base_url, workdir, 'icon', args.icons)
+    if args.screenshots:
+        yield 'screenshots', lambda base_url, workdir: bench_media(base_url, workdir, 'screenshot', args.screenshots)
+    if args.sizes:
+        yield 'sizes', lambda base_url, workdir: bench_sizes(base_url, workdir, args.sizes)
+    if args.download_mb:
+        yield 'download', lambda base_url, workdir: bench_download(base_url, workdir, args.download_mb, args.segments)
+
+def command_run(args):
+    _ = QApplication.instance() or QApplication([])  # held for the whole run
+    workdir = Path(tempfile.mkdtemp(prefix='pidorlauncher-bench-'))
+    os.environ['XDG_CACHE_HOME'] = str(workdir / "cache")
+    os.environ['XDG_DATA_HOME'] = str(workdir / "data")
+    results = {}
+    try:
+        with StandInProcess(args.latency_ms, args.bandwidth_kb, args.error_rate, args.seed) as server:
+            for name, scenario in scenarios(args):
+                if args.only and name not in args.only:
+                    continue
+                runs = []
+                for run in range(args.warmup + args.repeat):
+                    run_dir = workdir / f"{name}-{run}"
+                    run_dir.mkdir()
+                    runs.append(scenario(server.base_url, run_dir))
+                    shutil.rmtree(run_dir, ignore_errors=True)
+                results[name] = median_metrics(runs[args.warmup:])
+                print(f"{name}: {json.dumps(results[name], ensure_ascii=False)}", file=sys.stderr)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'version': APP_VERSION,
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'config': {
+            'latency_ms': args.latency_ms,
+            'bandwidth_kb': args.bandwidth_kb,
+            'error_rate': args.error_rate,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'warmup': args.warmup,
+            'segments': args.segments,
+        },
+        'results': results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+def higher_is_better(metric):
+    return metric.endswith('_per_s')
+
+def is_compared(metric):
+    return higher_is_better(metric) or metric.endswith(('_s', '_mb'))
+
+def command_compare(args):
+    with open(args.baseline, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    with open(args.current, 'r', encoding='utf-8') as file:
+        current = json.load(file)
+    if baseline.get('config') != current.get('config'):
+        print("Внимание: замеры сделаны с разными настройками сервера", file=sys.stderr)
+
+    regressions = 0
+    print(f"{'сценарий':<20} {'метрика':<20} {baseline.get('revision') or 'было':>12} "
+          f"{current.get('revision') or 'стало':>12} {'изменение':>10}")
+    for scenario, metrics in current['results'].items():
+        old_metrics = baseline['results'].get(scenario, {})
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not is_compared(metric) or not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+                continue
+            change = (value - old) / old if old else 0.0
+            worse = -change if higher_is_better(metric) else change
+            flag = ''
+            if worse > args.threshold and abs(value - old) > args.min_delta:
+                flag = ' ✗'
+                regressions += 1
+            print(f"{scenario:<20} {metric:<20} {old:>12} {value:>12} {change:>+9.1%}{flag}")
+    if regressions:
+        print(f"Ухудшений больше {args.threshold:.0%}: {regressions}", file=sys.stderr)
+    return 1 if regressions else 0
+
+def comma_list(text):
+    return [int(value) for value in text.split(',') if value]
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='bench.py', description='Замеры производительности лаунчера '
+                                                                  'на локальном сервере-заглушке')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='прогнать сценарии и выдать результаты в JSON')
+    run.add_argument('--catalogs', type=comma_list, default=list(DEFAULT_CATALOGS),
+                     help='размеры каталогов через запятую')
+    run.add_argument('--memory-apps', type=int, default=100000,
+                     help='на каталоге какого размера сравнить память словарей и CatalogEntry (0 — не сравнивать)')
+    run.add_argument('--icons', type=int, default=500, help='сколько иконок загрузить')
+    run.add_argument('--screenshots', type=int, default=40, help='сколько скриншотов загрузить')
+    run.add_argument('--sizes', type=int, default=1000, help='сколько размеров файлов проверить')
+    run.add_argument('--download-mb', type=int, default=512, help='размер скачиваемого файла, МБ')
+    run.add_argument('--segments', type=int, default=Downloader.SEGMENTS, help='потоков на файл')
+    run.add_argument('--latency-ms', type=float, default=0, help='задержка сервера на каждый ответ')
+    run.add_argument('--bandwidth-kb', type=int, default=0, help='скорость одного соединения, КБ/с')
+    run.add_argument('--error-rate', type=float, default=0, help='доля ответов с ошибкой')
+    run.add_argument('--seed', type=int, default=0)
+    run.add_argument('--repeat', type=int, default=3, help='сколько раз повторить сценарий (берётся медиана)')
+    run.add_argument('--warmup', type=int, default=1, help='сколько прогонов сделать до замера и отбросить')
+    run.add_argument('--only', nargs='+', help='запустить только эти сценарии')
+    run.add_argument('--output', help='куда записать JSON (по умолчанию stdout)')
+
+    compare = commands.add_parser('compare', help='сравнить два файла с результатами')
+    compare.add_argument('baseline')
+    compare.add_argument('current')
+    compare.add_argument('--threshold', type=float, default=0.10, help='допустимое ухудшение, доля')
+    compare.add_argument('--min-delta', type=float, default=0.01, help='игнорировать разницу меньше этой')
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'compare':
+        return command_compare(args)
+    return command_run(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import sys
+import json
+import time
+import random
+import re
+import struct
+import zlib
+import argparse
+import functools
+import threading
+import http.server
+import urllib.parse
+
+ICON_SIZE = (256, 256)
+SCREENSHOT_SIZE = (1920, 1080)
+ARTIFACT_BLOCK_SIZE = 1024 * 1024
+WRITE_SIZE = 64 * 1024
+CATEGORIES = ('Игры', 'Утилиты', 'Офис', 'Мультимедиа', 'Разработка', 'Интернет')
+
+def png_image(width, height, seed):
+    pattern = bytes((i * 7 + seed) % 251 for i in range(width * 3 + 1024))
+    rows = []
+    for y in range(height):
+        offset = (y * 13 + seed) % 1024
+        rows.append(b'\x00' + pattern[offset:offset + width * 3])
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(b''.join(rows), 1)) + chunk(b'IEND', b''))
+
+class StandIn:
+    def __init__(self, latency=0.0, bandwidth=0, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.block = random.Random(seed).randbytes(ARTIFACT_BLOCK_SIZE)
+        self.base_url = None
+        self.counters = {}
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def inject_error(self):
+        if not self.error_rate:
+            return None
+        with self.lock:
+            if self.random.random() >= self.error_rate:
+                return None
+            return self.random.choice(('status', 'truncate'))
+
+    @functools.lru_cache(maxsize=8)
+    def catalog(self, count):
+        programs = []
+        for i in range(count):
+            programs.append({
+                'name': f"Приложение {i}",
+                'version': f"{1 + i % 5}.{i % 17}.{i % 3}",
+                'developer': f"Разработчик {i % 97}",
+                'category': CATEGORIES[i % len(CATEGORIES)],
+                'description': f"Синтетическое приложение номер {i} для замеров производительности. " * 3,
+                'download_url': f"{self.base_url}/artifact/{1024 * 1024 + i * 4096}.bin",
+                'icon_url': f"{self.base_url}/icon/{i}.png",
+                'screenshots': [f"{self.base_url}/screenshot/{i * 4 + j}.png" for j in range(4)],
+            })
+        return json.dumps({'programs': programs}, ensure_ascii=False).encode('utf-8')
+
+    @functools.lru_cache(maxsize=2048)
+    def icon(self, seed):
+        return png_image(*ICON_SIZE, seed)
+
+    @functools.lru_cache(maxsize=64)
+    def screenshot(self, seed):
+        return png_image(*SCREENSHOT_SIZE, seed)
+
+    def artifact_slices(self, start, end):
+        position = start
+        while position <= end:
+            offset = position % ARTIFACT_BLOCK_SIZE
+            length = min(WRITE_SIZE, ARTIFACT_BLOCK_SIZE - offset, end - position + 1)
+            yield self.block[offset:offset + length]
+            position += length
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    ROUTES = (
+        (re.compile(r'^/catalog/(\d+)\.json$'), 'send_catalog'),
+        (re.compile(r'^/icon/(\d+)\.png$'), 'send_icon'),
+        (re.compile(r'^/screenshot/(\d+)\.png$'), 'send_screenshot'),
+        (re.compile(r'^/artifact/(\d+)\.bin$'), 'send_artifact'),
+        (re.compile(r'^/stats$'), 'send_stats'),
+    )
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.route()
+
+    def do_GET(self):
+        self.route()
+
+    def route(self):
+        self.error = None
+        path = urllib.parse.urlsplit(self.path).path
+        for pattern, handler in self.ROUTES:
+            match = pattern.match(path)
+            if match:
+                break
+        else:
+            self.send_body(404, b'')
+            return
+
+        stand_in = self.server.stand_in
+        stand_in.count(handler[5:])
+        if handler != 'send_stats':
+            if stand_in.latency:
+                time.sleep(stand_in.latency)
+            self.error = stand_in.inject_error()
+            if self.error == 'status':
+                self.send_body(503, b'', {'Retry-After': '0'})
+                return
+        getattr(self, handler)(*match.groups())
+
+    def send_catalog(self, count):
+        body = self.server.stand_in.catalog(int(count))
+        etag = f'"catalog-{count}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(304, b'', {'ETag': etag})
+            return
+        self.send_body(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+    def send_icon(self, seed):
+        self.send_image(self.server.stand_in.icon(int(seed)), f'"icon-{seed}"')
+
+    def send_screenshot(self, seed):
+        self.send_image(self.server.stand_in.screenshot(int(seed) % 64), f'"screenshot-{seed}"')
+
+    def send_image(self, body, etag):
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(304, b'', {'ETag': etag})
+            return
+        self.send_body(200, body, {'Content-Type': 'image/png', 'ETag': etag})
+
+    def send_stats(self):
+        with self.server.stand_in.lock:
+            body = json.dumps(self.server.stand_in.counters).encode('utf-8')
+        self.send_body(200, body, {'Content-Type': 'application/json'})
+
+    def send_artifact(self, size):
+        size = int(size)
+        start, end, status = 0, size - 1, 200
+        headers = {'Accept-Ranges': 'bytes', 'ETag': f'"artifact-{size}"', 'Content-Type': 'application/octet-stream'}
+        match = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range', ''))
+        if match and self.headers.get('If-Range', headers['ETag']) == headers['ETag']:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start >= size:
+                self.send_body(416, b'', {'Content-Range': f'bytes */{size}'})
+                return
+            status = 206
+            headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        self.send_headers(status, end - start + 1, headers)
+        if self.command != 'HEAD':
+            self.write_paced(self.server.stand_in.artifact_slices(start, end), end - start + 1)
+
+    def send_headers(self, status, length, headers):
+        self.send_response(status)
+        self.send_header('Content-Length', str(length))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def send_body(self, status, body, headers=None):
+        self.send_headers(status, len(body), headers or {})
+        if self.command != 'HEAD' and body:
+            self.write_paced((body[i:i + WRITE_SIZE] for i in range(0, len(body), WRITE_SIZE)), len(body))
+
+    def write_paced(self, pieces, length):
+        bandwidth = self.server.stand_in.bandwidth
+        cutoff = length // 2 if self.error == 'truncate' else None
+        started = time.monotonic()
+        sent = 0
+        try:
+            for piece in pieces:
+                if cutoff is not None and sent + len(piece) > cutoff:
+                    self.wfile.write(piece[:cutoff - sent])
+                    self.wfile.flush()
+                    self.close_connection = True
+                    return
+                self.wfile.write(piece)
+                sent += len(piece)
+                if bandwidth:
+                    delay = sent / bandwidth - (time.monotonic() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+class StandInServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, stand_in, host='127.0.0.1', port=0):
+        super().__init__((host, port), StandInHandler)
+        self.stand_in = stand_in
+        stand_in.base_url = f"http://{host}:{self.server_address[1]}"
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Локальный сервер-заглушка для замеров: каталоги, иконки, '
+                                                 'скриншоты и большие файлы с задержкой, ограничением скорости и ошибками')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 — любой свободный')
+    parser.add_argument('--latency-ms', type=float, default=0, help='задержка перед каждым ответом')
+    parser.add_argument('--bandwidth-kb', type=int, default=0, help='скорость на одно соединение, КБ/с (0 — без ограничения)')
+    parser.add_argument('--error-rate', type=float, default=0, help='доля ответов с ошибкой 503 или оборванным телом')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    stand_in = StandIn(args.latency_ms / 1000, args.bandwidth_kb * 1024, args.error_rate, args.seed)
+    server = StandInServer(stand_in, args.host, args.port)
+    print(stand_in.base_url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    sys.exit(main())
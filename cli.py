@@ -0,0 +1,306 @@
+import sys
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+from core import (APP_VERSION, CATALOG_URL, CatalogLoader, CatalogEntry, SearchIndex, SizeCache, Downloader,
+                  DownloadStopped, parse_programs_data, download_path_for, format_file_size, format_duration)
+
+COMMANDS = ('list', 'search', 'info', 'download')
+DEFAULT_JOBS = 3
+PROGRESS_INTERVAL = 1.0
+
+class CliError(Exception):
+    pass
+
+def is_cli_command(argv):
+    return bool(argv) and (argv[0] in COMMANDS or argv[0] in ('-h', '--help', '--version'))
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='pidorlauncher',
+                                     description='Скачивай крутой софт от GovNo и других разрабов!! '
+                                                 'Без команды запускается графический интерфейс.')
+    parser.add_argument('--version', action='version', version=APP_VERSION)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--json', action='store_true', help='вывод в формате JSON')
+    common.add_argument('--catalog', default=CATALOG_URL, help='URL или путь к файлу каталога')
+    common.add_argument('--offline', action='store_true', help='не обращаться к серверу, взять каталог из кэша')
+
+    facets = argparse.ArgumentParser(add_help=False)
+    facets.add_argument('--developer', help='только приложения этого разработчика')
+    facets.add_argument('--category', help='только приложения этой категории')
+
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', parents=[common, facets], help='список приложений')
+
+    search = commands.add_parser('search', parents=[common, facets], help='поиск по каталогу')
+    search.add_argument('query')
+    search.add_argument('--limit', type=int, default=20, help='сколько результатов показать (0 — все)')
+
+    info = commands.add_parser('info', parents=[common], help='подробности о приложении')
+    info.add_argument('name')
+
+    download = commands.add_parser('download', parents=[common], help='скачать приложения')
+    download.add_argument('names', nargs='+')
+    download.add_argument('--dir', help='куда сохранять (по умолчанию ~/Downloads)')
+    download.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help='сколько загрузок вести одновременно')
+    download.add_argument('--segments', type=int, default=Downloader.SEGMENTS, help='потоков на один файл')
+    return parser
+
+def load_catalog(args):
+    if os.path.isfile(args.catalog):
+        with open(args.catalog, 'r', encoding='utf-8') as file:
+            return parse_programs_data(json.load(file))
+
+    loader = CatalogLoader(args.catalog)
+    meta, cached_data = loader.load_cached()
+    if args.offline:
+        if not cached_data:
+            raise CliError("Каталог ещё не закэширован, запустите без --offline")
+        return cached_data
+
+    try:
+        if cached_data:
+            changes = loader.fetch_changes(cached_data, meta.get('revision'), meta)
+            programs_data = changes.programs if changes is not None else None
+        else:
+            programs_data = loader.fetch(meta)
+    except Exception as e:
+        if not cached_data:
+            raise CliError(f"Не удалось загрузить каталог: {e}")
+        print(f"Не удалось обновить каталог ({e}), используется кэш")
+        return cached_data
+
+    if programs_data is None:
+        return cached_data
+    loader.save(programs_data)
+    return programs_data
+
+def facet_filters(index, args):
+    filters = {}
+    for name in SearchIndex.FACETS:
+        value = getattr(args, name, None)
+        if not value:
+            continue
+        values = {known.casefold(): known for known, count in index.facet_values(name)}
+        if value.casefold() not in values:
+            raise CliError(f"Нет приложений с {name} = {value}")
+        filters[name] = values[value.casefold()]
+    return filters
+
+def find_app(apps, index, name):
+    folded = name.casefold()
+    for app in apps:
+        if app['name'].casefold() == folded:
+            return app, []
+    generation, rows = index.search(name)
+    return None, [apps[row]['name'] for row in (rows or [])[:3]]
+
+def not_found_message(name, suggestions):
+    message = f"Приложение «{name}» не найдено"
+    if suggestions:
+        message += f". Может быть: {', '.join(suggestions)}"
+    return message
+
+def app_line(app):
+    details = [str(app[key]) for key in ('developer', 'category', 'version') if app.get(key)]
+    return f"{app['name']} — {' · '.join(details)}" if details else app['name']
+
+def known_size(app, size_cache):
+    size = app.get('size')
+    if isinstance(size, int):
+        return size
+    entry = size_cache.lookup(app['download_url'])
+    return entry['size'] if entry is not None else None
+
+def command_list(args, apps, index, out):
+    filters = facet_filters(index, args)
+    generation, rows = index.search('', **filters)
+    selected = apps if rows is None else [apps[row] for row in rows]
+    if args.json:
+        json.dump(selected, out, ensure_ascii=False, indent=2, default=CatalogEntry.to_dict)
+        print(file=out)
+    else:
+        for app in selected:
+            print(app_line(app), file=out)
+    return 0
+
+def command_search(args, apps, index, out):
+    filters = facet_filters(index, args)
+    generation, rows = index.search(args.query, **filters)
+    selected = apps if rows is None else [apps[row] for row in rows]
+    if args.limit > 0:
+        selected = selected[:args.limit]
+    if args.json:
+        json.dump(selected, out, ensure_ascii=False, indent=2, default=CatalogEntry.to_dict)
+        print(file=out)
+    else:
+        for app in selected:
+            print(app_line(app), file=out)
+    return 0 if selected else 1
+
+def command_info(args, apps, index, out):
+    app, suggestions = find_app(apps, index, args.name)
+    if app is None:
+        raise CliError(not_found_message(args.name, suggestions))
+
+    size = known_size(app, SizeCache())
+    if args.json:
+        json.dump(dict(app, size=size), out, ensure_ascii=False, indent=2)
+        print(file=out)
+        return 0
+
+    print(app['name'], file=out)
+    for key, label in (('developer', 'Разработчик'), ('category', 'Категория'), ('version', 'Версия')):
+        if app.get(key):
+            print(f"{label}: {app[key]}", file=out)
+    if size is not None:
+        print(f"Размер: {format_file_size(size)}", file=out)
+    print(f"Ссылка: {app['download_url']}", file=out)
+    for mirror in app.get('mirrors') or []:
+        print(f"Зеркало: {mirror}", file=out)
+    if app.get('sha256'):
+        print(f"SHA-256: {app['sha256']}", file=out)
+    if app.get('description'):
+        print(file=out)
+        print(app['description'], file=out)
+    return 0
+
+class DownloadReporter:
+    def __init__(self, names):
+        self.names = names
+        self.progress = {}
+
+    def update(self, name, payload):
+        self.progress[name] = payload
+
+    def status_line(self):
+        parts = []
+        for name in self.names:
+            payload = self.progress.get(name)
+            if payload is None:
+                continue
+            if payload['progress'] >= 0:
+                text = f"{name} {payload['progress']}%"
+            else:
+                text = f"{name} {format_file_size(payload['downloaded'])}"
+            if payload['average_speed'] > 0:
+                text += f" {format_file_size(payload['average_speed'])}/с"
+            if payload['eta'] is not None:
+                text += f" ~{format_duration(payload['eta'])}"
+            parts.append(text)
+        return ' | '.join(parts)
+
+def download_app(app, save_path, args, reporter, downloaders, stopped):
+    result = {'name': app['name'], 'url': app['download_url'], 'path': save_path}
+    if stopped.is_set():
+        return dict(result, status='stopped')
+    downloader = Downloader(app['download_url'], save_path, args.segments,
+                            expected_sha256=app.get('sha256'), expected_size=app.get('size'),
+                            mirrors=app.get('mirrors'),
+                            on_progress=lambda payload: reporter.update(app['name'], payload))
+    downloaders.append(downloader)
+    if stopped.is_set():
+        downloader.stop()
+    started = time.monotonic()
+    try:
+        downloader.run()
+    except DownloadStopped:
+        return dict(result, status='stopped')
+    except Exception as e:
+        return dict(result, status='error', error=str(e))
+    return dict(result, status='ok', size=os.path.getsize(save_path),
+                seconds=round(time.monotonic() - started, 2))
+
+def command_download(args, apps, index, out):
+    results = {}
+    keys = []
+    selected = []
+    for name in args.names:
+        app, suggestions = find_app(apps, index, name)
+        key = app['name'] if app is not None else name
+        if key in keys:
+            continue
+        keys.append(key)
+        if app is None:
+            results[key] = {'name': name, 'status': 'not_found', 'error': not_found_message(name, suggestions)}
+        else:
+            selected.append(app)
+
+    save_paths = []
+    for app in selected:
+        save_paths.append(download_path_for(app, args.dir, save_paths))
+
+    reporter = DownloadReporter([app['name'] for app in selected])
+    downloaders = []
+    stopped = threading.Event()
+    show_progress = not args.json and sys.stderr.isatty()
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        pending = {executor.submit(download_app, app, save_path, args, reporter, downloaders, stopped): app
+                   for app, save_path in zip(selected, save_paths)}
+        try:
+            while pending:
+                done, not_done = wait(pending, timeout=PROGRESS_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[pending.pop(future)['name']] = result
+                    if not args.json:
+                        print_result(result, out)
+                if show_progress and pending:
+                    print(f"\r\033[K{reporter.status_line()}", end='', file=sys.stderr, flush=True)
+        except KeyboardInterrupt:
+            stopped.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for downloader in list(downloaders):
+                downloader.stop()
+            raise
+        finally:
+            if show_progress:
+                print("\r\033[K", end='', file=sys.stderr, flush=True)
+
+    ordered = [results[key] for key in keys]
+    if args.json:
+        json.dump(ordered, out, ensure_ascii=False, indent=2)
+        print(file=out)
+    else:
+        for result in ordered:
+            if result['status'] == 'not_found':
+                print_result(result, out)
+    return 0 if all(result['status'] == 'ok' for result in ordered) else 1
+
+def print_result(result, out):
+    if result['status'] == 'ok':
+        print(f"✓ {result['name']} → {result['path']} ({format_file_size(result['size'])}, "
+              f"{format_duration(result['seconds'])})", file=out)
+    else:
+        print(f"✗ {result['name']}: {result.get('error', result['status'])}", file=out)
+
+HANDLERS = {
+    'list': command_list,
+    'search': command_search,
+    'info': command_info,
+    'download': command_download,
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    try:
+        with redirect_stdout(sys.stderr):
+            apps = load_catalog(args)
+            index = SearchIndex()
+            index.update(apps)
+            return HANDLERS[args.command](args, apps, index, out)
+    except CliError as e:
+        print(e, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print("Прервано", file=sys.stderr)
+        return 130
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
@@ -0,0 +1,2444 @@
+import os
+import sys
+import socket
+import json
+import threading
+import bisect
+import itertools
+import re
+import codecs
+import errno
+import http.client
+import hashlib
+import glob
+import shutil
+import struct
+import marshal
+import zlib
+import difflib
+import time
+import logging
+from collections import Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import urllib.parse
+
+APP_VERSION = "1.5.0"
+CATALOG_URL = "https://zenusus.serv00.net/programs/programs.json"
+
+logger = logging.getLogger(__name__)
+
+class NetworkTrace:
+    def __init__(self, trace_id, method, url, kind, headers, initiator):
+        self.id = trace_id
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.method = method
+        self.url = url
+        self.kind = kind
+        self.thread = threading.current_thread().name
+        self.initiator = initiator
+        self.request_headers = dict(headers or {})
+        self.conditional = any(name.lower() in ('if-none-match', 'if-modified-since') for name in self.request_headers)
+        self.status = None
+        self.response_headers = {}
+        self.cache = None
+        self.bytes = 0
+        self.error = None
+        self.state = 'pending'
+        self.dns = None
+        self.tcp = 0.0
+        self.handshake = 0.0
+        self.connections = 0
+        self.send = 0.0
+        self.sent = None
+        self.headers_received = None
+        self.finished = None
+        self.raw = None
+
+    def timings(self):
+        end = self.finished or time.perf_counter()
+        total = end - self.started
+        connect = max(0.0, self.tcp - (self.dns or 0.0)) if self.connections else None
+        tls = max(0.0, self.handshake - self.tcp) if self.connections and self.url.startswith('https') else None
+        wait = self.headers_received - self.sent if self.headers_received and self.sent else None
+        receive = end - self.headers_received if self.headers_received and self.finished else None
+        known = sum(value for value in (self.dns, connect, tls, self.send, wait, receive) if value)
+        timings = {
+            'blocked': max(0.0, total - known) if self.finished else None,
+            'dns': self.dns,
+            'connect': connect,
+            'tls': tls,
+            'send': self.send if self.sent else None,
+            'wait': wait,
+            'receive': receive,
+            'total': total,
+        }
+        return {name: round(value * 1000, 2) if value is not None else None for name, value in timings.items()}
+
+    def received(self):
+        if self.raw is not None and self.method != 'HEAD':
+            return self.raw.tell()
+        return self.bytes
+
+    def as_dict(self):
+        return {
+            'id': self.id,
+            'started_at': self.started_at,
+            'method': self.method,
+            'url': self.url,
+            'kind': self.kind,
+            'thread': self.thread,
+            'initiator': self.initiator,
+            'state': self.state,
+            'status': self.status,
+            'cache': self.cache,
+            'bytes': self.received(),
+            'connections': self.connections,
+            'error': self.error,
+            'timings': self.timings(),
+            'request_headers': self.request_headers,
+            'response_headers': self.response_headers,
+        }
+
+class NetworkTracer:
+    CAPACITY = 1000
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, capacity=CAPACITY):
+        self.entries = deque(maxlen=capacity)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.sequence = itertools.count(1)
+        self.revision = 0
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add(self, trace):
+        with self.lock:
+            self.entries.append(trace)
+            self.revision += 1
+
+    def begin(self, method, url, kind, headers, initiator):
+        trace = NetworkTrace(next(self.sequence), method, url, kind, headers, initiator)
+        self.local.trace = trace
+        self.add(trace)
+        return trace
+
+    def current(self):
+        return getattr(self.local, 'trace', None)
+
+    def end(self, trace):
+        if self.current() is trace:
+            self.local.trace = None
+
+    def response_started(self, trace, response):
+        trace.raw = response
+        trace.status = response.status
+        trace.response_headers = dict(response.headers)
+        if response.status == 304:
+            trace.cache = 'revalidated'
+        elif trace.conditional:
+            trace.cache = 'changed'
+        else:
+            trace.cache = 'miss'
+        with self.lock:
+            self.revision += 1
+
+    def watch(self, trace, response):
+        self.response_started(trace, response)
+        release_conn = response.release_conn
+
+        def release():
+            self.finish(trace, response)
+            release_conn()
+        response.release_conn = release
+
+    def finish(self, trace, response=None, error=None):
+        if trace.finished is not None:
+            return
+        if response is not None:
+            if response is not trace.raw:
+                return
+            if response.status in (301, 302, 303, 307, 308) and response.get_redirect_location():
+                return
+        trace.finished = time.perf_counter()
+        if error is not None:
+            trace.error = str(error)
+            trace.state = 'failed'
+        else:
+            trace.state = 'done'
+        with self.lock:
+            self.revision += 1
+
+    def record_cache_hit(self, url, kind):
+        trace = NetworkTrace(next(self.sequence), 'GET', url, kind, None, None)
+        trace.cache = 'hit'
+        trace.state = 'done'
+        trace.finished = trace.started
+        self.add(trace)
+
+    def failure(self, url, message):
+        logger.debug(message)
+        with self.lock:
+            for trace in reversed(self.entries):
+                if url is not None and trace.url == url:
+                    if trace.error is None:
+                        trace.error = message
+                    trace.state = 'failed'
+                    self.revision += 1
+                    return
+
+        trace = NetworkTrace(next(self.sequence), None, url, None, None, None)
+        trace.error = message
+        trace.state = 'failed'
+        trace.finished = trace.started
+        self.add(trace)
+
+    def snapshot(self):
+        with self.lock:
+            entries = list(self.entries)
+            revision = self.revision
+        return revision, [trace.as_dict() for trace in entries]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.revision += 1
+
+    def export_json(self):
+        revision, entries = self.snapshot()
+        return {'version': APP_VERSION, 'exported_at': time.time(), 'entries': entries}
+
+    def export_har(self):
+        revision, entries = self.snapshot()
+        return {'log': {
+            'version': '1.2',
+            'creator': {'name': 'pidorlauncher', 'version': APP_VERSION},
+            'pages': [],
+            'entries': [self.har_entry(entry) for entry in entries if entry['method'] and entry['cache'] != 'hit'],
+        }}
+
+    @staticmethod
+    def har_entry(entry):
+        timings = entry['timings']
+
+        def har_time(name):
+            value = timings.get(name)
+            return value if value is not None else -1
+
+        connect = har_time('connect')
+        if connect >= 0 and timings['tls'] is not None:
+            connect += timings['tls']
+        started = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(entry['started_at']))
+        started += f".{int(entry['started_at'] % 1 * 1000):03d}Z"
+        response_headers = {name.lower(): value for name, value in entry['response_headers'].items()}
+        return {
+            'startedDateTime': started,
+            'time': timings['total'],
+            'request': {
+                'method': entry['method'],
+                'url': entry['url'],
+                'httpVersion': 'HTTP/1.1',
+                'cookies': [],
+                'headers': [{'name': name, 'value': value} for name, value in entry['request_headers'].items()],
+                'queryString': [{'name': name, 'value': value}
+                                for name, value in urllib.parse.parse_qsl(urllib.parse.urlsplit(entry['url']).query)],
+                'headersSize': -1,
+                'bodySize': 0,
+            },
+            'response': {
+                'status': entry['status'] or 0,
+                'statusText': http.client.responses.get(entry['status'], '') if entry['status'] else '',
+                'httpVersion': 'HTTP/1.1',
+                'cookies': [],
+                'headers': [{'name': name, 'value': value} for name, value in entry['response_headers'].items()],
+                'content': {'size': entry['bytes'], 'mimeType': response_headers.get('content-type', '')},
+                'redirectURL': response_headers.get('location', ''),
+                'headersSize': -1,
+                'bodySize': entry['bytes'] if entry['status'] else -1,
+            },
+            'cache': {},
+            'timings': {
+                'blocked': har_time('blocked'),
+                'dns': har_time('dns'),
+                'connect': connect,
+                'ssl': har_time('tls'),
+                'send': max(0, har_time('send')),
+                'wait': max(0, har_time('wait')),
+                'receive': max(0, har_time('receive')),
+            },
+            '_kind': entry['kind'],
+            '_thread': entry['thread'],
+            '_initiator': entry['initiator'],
+            '_cache': entry['cache'],
+            '_error': entry['error'],
+        }
+
+class DnsCache:
+    TTL = 300
+
+    def __init__(self, ttl=TTL):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.original_getaddrinfo = None
+
+    def install(self):
+        if self.original_getaddrinfo is None:
+            self.original_getaddrinfo = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+        trace = NetworkTracer.shared().current()
+        if entry and entry[0] > now:
+            if trace is not None and trace.dns is None:
+                trace.dns = 0.0
+            return entry[1]
+
+        result = self.original_getaddrinfo(host, port, family, type, proto, flags)
+        if trace is not None:
+            trace.dns = (trace.dns or 0.0) + time.monotonic() - now
+        with self.lock:
+            self.entries[key] = (now + self.ttl, result)
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class HttpClient:
+    TIMEOUTS = {
+        'api': (5, 10),
+        'media': (5, 10),
+        'download': (10, 30),
+    }
+    DEFAULT_POOL_SIZE = 8
+    POOL_SIZES = {
+        'zenusus.serv00.net': 16,
+    }
+    USER_AGENT = f"pidorlauncher/{APP_VERSION}"
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_sizes=None):
+        import requests
+        from urllib3.util.retry import Retry
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = self.USER_AGENT
+
+        self.retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+        )
+        for scheme in ('https://', 'http://'):
+            self.session.mount(scheme, self.make_adapter(self.DEFAULT_POOL_SIZE, self.DEFAULT_POOL_SIZE))
+
+        for host, pool_size in (pool_sizes or self.POOL_SIZES).items():
+            self.mount_host(host, pool_size)
+
+        self.dns_cache = DnsCache()
+        self.dns_cache.install()
+        self.tracer = NetworkTracer.shared()
+        self.client_codes = {self.request.__code__, self.get.__code__, self.head.__code__, self.initiator.__code__}
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def make_adapter(self, pool_size, host_pools=1):
+        from httptrace import TracingAdapter
+        return TracingAdapter(pool_connections=host_pools, pool_maxsize=pool_size, max_retries=self.retry)
+
+    def mount_host(self, host, pool_size):
+        for scheme in ('https://', 'http://'):
+            self.session.mount(f"{scheme}{host}/", self.make_adapter(pool_size))
+
+    def request(self, method, url, kind='api', **kwargs):
+        kwargs.setdefault('timeout', self.TIMEOUTS[kind])
+        trace = self.tracer.begin(method, url, kind, kwargs.get('headers'), self.initiator())
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            self.tracer.finish(trace, error=e)
+            raise
+        finally:
+            self.tracer.end(trace)
+        if not kwargs.get('stream'):
+            self.tracer.finish(trace)
+        return response
+
+    def initiator(self):
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code in self.client_codes:
+            frame = frame.f_back
+        if frame is None:
+            return None
+        return getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)
+
+    def get(self, url, kind='api', **kwargs):
+        return self.request('GET', url, kind, **kwargs)
+
+    def head(self, url, kind='api', **kwargs):
+        kwargs.setdefault('allow_redirects', True)
+        return self.request('HEAD', url, kind, **kwargs)
+
+class TokenBucket:
+    BURST_SECONDS = 0.25
+
+    def __init__(self, rate=0):
+        self.rate = 0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        if rate != self.rate:
+            self.rate = rate
+            self.tokens = min(self.tokens, self.capacity())
+
+    def capacity(self):
+        return max(self.rate * self.BURST_SECONDS, BandwidthScheduler.MIN_CHUNK_SIZE)
+
+    def reserve(self, size, now):
+        elapsed = now - self.updated
+        self.updated = now
+        if self.rate <= 0:
+            self.tokens = 0.0
+            return 0.0
+        self.tokens = min(self.capacity(), self.tokens + elapsed * self.rate) - size
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+class BandwidthScheduler:
+    PRIORITY_DOWNLOAD = 2
+    PRIORITY_MEDIA = 1
+    PRIORITY_BACKGROUND = 0
+
+    SHARES = {
+        PRIORITY_MEDIA: 0.25,
+        PRIORITY_BACKGROUND: 0.1,
+    }
+    ACTIVE_WINDOW = 1.0
+    MIN_REFERENCE_RATE = 64 * 1024
+    MIN_CHUNK_SIZE = 16 * 1024
+    CHUNKS_PER_SECOND = 10
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, limit=0):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.global_bucket = TokenBucket(limit)
+        self.class_buckets = {priority: TokenBucket() for priority in self.SHARES}
+        self.active_at = {}
+        self.window_started = time.monotonic()
+        self.window_bytes = Counter()
+        self.rates = Counter()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def set_limit(self, limit):
+        with self.lock:
+            self.limit = max(0, int(limit))
+            self.global_bucket.set_rate(self.limit)
+
+    def chunk_limit(self, priority):
+        with self.lock:
+            rate = self.limit
+            if priority in self.SHARES:
+                class_rate = self.class_buckets[priority].rate
+                if class_rate > 0:
+                    rate = min(rate, class_rate) if rate > 0 else class_rate
+        if rate <= 0:
+            return None
+        return max(self.MIN_CHUNK_SIZE, int(rate / self.CHUNKS_PER_SECOND))
+
+    def consume(self, size, priority, event=None):
+        wait = event.wait if event is not None else time.sleep
+        if priority in self.SHARES:
+            with self.lock:
+                now = time.monotonic()
+                bucket = self.class_buckets[priority]
+                bucket.set_rate(self.class_rate(priority, now))
+                delay = bucket.reserve(size, now)
+            if delay > 0 and wait(delay):
+                return
+
+        with self.lock:
+            now = time.monotonic()
+            self.record(priority, size, now)
+            delay = self.global_bucket.reserve(size, now)
+        if delay > 0:
+            wait(delay)
+
+    def class_rate(self, priority, now):
+        higher = [p for p, active_at in self.active_at.items()
+                  if p > priority and now - active_at < self.ACTIVE_WINDOW]
+        if not higher:
+            return 0
+        reference = self.limit or max(self.MIN_REFERENCE_RATE, sum(self.rates[p] for p in higher))
+        return reference * self.SHARES[priority]
+
+    def record(self, priority, size, now):
+        self.active_at[priority] = now
+        self.window_bytes[priority] += size
+        elapsed = now - self.window_started
+        if elapsed >= self.ACTIVE_WINDOW:
+            self.rates = Counter({p: count / elapsed for p, count in self.window_bytes.items()})
+            self.window_bytes = Counter()
+            self.window_started = now
+
+    def read(self, response, priority, event=None):
+        data = bytearray()
+        chunk_size = self.chunk_limit(priority) or 64 * 1024
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            data += chunk
+            self.consume(len(chunk), priority, event)
+        return bytes(data)
+
+def user_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(base) / "pidorlauncher"
+
+def user_data_dir():
+    base = os.environ.get('XDG_DATA_HOME') or os.path.join(Path.home(), '.local', 'share')
+    return Path(base) / "pidorlauncher"
+
+class MediaCache:
+    VARIANTS = {
+        'icon48': (48, 48),
+        'icon96': (96, 96),
+        'screenshot': (400, 250),
+    }
+    DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+    DEFAULT_MAX_AGE = 24 * 60 * 60
+    INDEX_SAVE_INTERVAL = 2.0
+    EVICT_TARGET = 0.9
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.variants_dir = self.root / "variants"
+        self.index_path = self.root / "index.json"
+        self.max_bytes = max_bytes
+        self.lock = threading.RLock()
+        self.index_saved_at = 0
+        self.dirty = False
+
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.variants_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                index = json.load(file)
+            self.urls = index.get('urls', {})
+            self.objects = index.get('objects', {})
+        except (OSError, ValueError):
+            self.urls = {}
+            self.objects = {}
+
+        self.total = sum(self.object_bytes(obj) for obj in self.objects.values())
+        self.urls_by_hash = {}
+        for url, entry in self.urls.items():
+            self.urls_by_hash.setdefault(entry['hash'], set()).add(url)
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(user_cache_dir() / "media")
+            return cls._shared
+
+    def set_max_bytes(self, max_bytes):
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def total_bytes(self):
+        with self.lock:
+            return self.total
+
+    @staticmethod
+    def object_bytes(obj):
+        return obj['size'] + sum(obj['variants'].values())
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.urls.get(url)
+            if entry is None or entry['hash'] not in self.objects:
+                return None
+            return dict(entry)
+
+    def is_fresh(self, entry):
+        return entry.get('expires', 0) > time.time()
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def read_original(self, content_hash):
+        return self.read_file(content_hash, self.objects_dir / content_hash)
+
+    def read_variant(self, content_hash, variant):
+        return self.read_file(content_hash, self.variants_dir / f"{content_hash}_{variant}")
+
+    def read_file(self, content_hash, path):
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+        with self.lock:
+            obj = self.objects.get(content_hash)
+            if obj is not None:
+                obj['atime'] = time.time()
+                self.dirty = True
+        return data
+
+    def store(self, url, data, headers):
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self.objects_dir / content_hash
+        if not path.exists():
+            self.write_file(path, data)
+
+        with self.lock:
+            obj = self.objects.get(content_hash)
+            if obj is None:
+                obj = self.objects[content_hash] = {'size': len(data), 'variants': {}}
+                self.total += len(data)
+            obj['atime'] = time.time()
+            previous = self.urls.get(url)
+            if previous is not None and previous['hash'] in self.urls_by_hash:
+                self.urls_by_hash[previous['hash']].discard(url)
+            self.urls_by_hash.setdefault(content_hash, set()).add(url)
+            self.urls[url] = {
+                'hash': content_hash,
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified'),
+                'expires': time.time() + self.max_age(headers),
+            }
+            self.dirty = True
+            self.evict()
+        self.save_index()
+        return content_hash
+
+    def store_variant(self, content_hash, variant, data):
+        self.write_file(self.variants_dir / f"{content_hash}_{variant}", data)
+        with self.lock:
+            obj = self.objects.get(content_hash)
+            if obj is not None:
+                self.total += len(data) - obj['variants'].get(variant, 0)
+                obj['variants'][variant] = len(data)
+                self.dirty = True
+                self.evict()
+        self.save_index()
+
+    def revalidated(self, url, headers):
+        with self.lock:
+            entry = self.urls.get(url)
+            if entry is None:
+                return
+            entry['expires'] = time.time() + self.max_age(headers)
+            if headers.get('etag'):
+                entry['etag'] = headers['etag']
+            self.dirty = True
+        self.save_index()
+
+    def max_age(self, headers):
+        cache_control = headers.get('cache-control', '').lower()
+        if 'no-cache' in cache_control or 'no-store' in cache_control:
+            return 0
+        for directive in cache_control.split(','):
+            name, _, value = directive.strip().partition('=')
+            if name == 'max-age' and value.isdigit():
+                return int(value)
+        return self.DEFAULT_MAX_AGE
+
+    def evict(self):
+        with self.lock:
+            if self.total <= self.max_bytes:
+                return
+            target = self.max_bytes * self.EVICT_TARGET
+            for content_hash, obj in sorted(self.objects.items(), key=lambda item: item[1].get('atime', 0)):
+                if self.total <= target:
+                    break
+                self.remove_object(content_hash)
+
+    def remove_object(self, content_hash):
+        obj = self.objects.pop(content_hash, None)
+        if obj is None:
+            return
+        self.total -= self.object_bytes(obj)
+        for url in self.urls_by_hash.pop(content_hash, ()):
+            if self.urls.get(url, {}).get('hash') == content_hash:
+                del self.urls[url]
+        paths = [self.objects_dir / content_hash]
+        paths += [self.variants_dir / f"{content_hash}_{variant}" for variant in obj['variants']]
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self.dirty = True
+
+    def write_file(self, path, data):
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        os.replace(tmp_path, path)
+
+    def save_index(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not self.dirty or (not force and now - self.index_saved_at < self.INDEX_SAVE_INTERVAL):
+                return
+            self.index_saved_at = now
+            self.dirty = False
+            data = json.dumps({'urls': self.urls, 'objects': self.objects})
+        self.write_file(self.index_path, data.encode('utf-8'))
+
+class CatalogCache:
+    def __init__(self, root=None):
+        self.root = Path(root) if root else user_cache_dir()
+        self.meta_path = self.root / "catalog.meta.json"
+        self.programs_path = self.root / "catalog.json"
+
+    def load_meta(self, url):
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url or not self.programs_path.exists():
+            return None
+        return meta
+
+    def load_programs(self):
+        try:
+            with open(self.programs_path, 'r', encoding='utf-8') as file:
+                return parse_programs_data(json.load(file))
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, meta):
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def save(self, url, headers, programs_data, revision=None):
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.write_json(self.programs_path, programs_data)
+        self.write_json(self.meta_path, {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'revision': revision,
+            'fetched_at': time.time(),
+            'count': len(programs_data),
+        })
+
+    def touch(self, url, headers):
+        meta = self.load_meta(url)
+        if meta is None:
+            return
+        meta['fetched_at'] = time.time()
+        if headers.get('etag'):
+            meta['etag'] = headers['etag']
+        self.write_json(self.meta_path, meta)
+
+    def write_json(self, path, data):
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False, separators=(',', ':'), default=CatalogEntry.to_dict)
+        os.replace(tmp_path, path)
+
+class SizeCache:
+    DEFAULT_TTL = 24 * 60 * 60
+    SAVE_INTERVAL = 5.0
+
+    def __init__(self, root=None, ttl=DEFAULT_TTL):
+        self.root = Path(root) if root else user_cache_dir()
+        self.path = self.root / "sizes.json"
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.saved_at = 0
+        self.dirty = False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.entries.get(url)
+            return dict(entry) if entry is not None else None
+
+    def is_fresh(self, entry):
+        return entry.get('checked_at', 0) + self.ttl > time.time()
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def sizes(self):
+        with self.lock:
+            return {url: entry['size'] for url, entry in self.entries.items()}
+
+    def store(self, url, size, headers):
+        with self.lock:
+            self.entries[url] = {
+                'size': size,
+                'etag': headers.get('etag'),
+                'last_modified': headers.get('last-modified'),
+                'checked_at': time.time(),
+            }
+            self.dirty = True
+
+    def revalidated(self, url, headers):
+        with self.lock:
+            entry = self.entries.get(url)
+            if entry is None:
+                return
+            entry['checked_at'] = time.time()
+            if headers.get('etag'):
+                entry['etag'] = headers['etag']
+            self.dirty = True
+
+    def prune(self, urls):
+        with self.lock:
+            for url in [url for url in self.entries if url not in urls]:
+                del self.entries[url]
+                self.dirty = True
+
+    def save(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not self.dirty or (not force and now - self.saved_at < self.SAVE_INTERVAL):
+                return
+            self.saved_at = now
+            self.dirty = False
+            data = json.dumps(self.entries, separators=(',', ':'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(tmp_path, self.path)
+
+class MirrorStats:
+    SAVE_INTERVAL = 5.0
+    SMOOTHING = 0.3
+    REFERENCE_SIZE = 4 * 1024 * 1024
+    FAILURE_PENALTY = 4.0
+    DEFAULT_RTT = 1.0
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else user_cache_dir()
+        self.path = self.root / "mirrors.json"
+        self.lock = threading.Lock()
+        self.saved_at = 0
+        self.dirty = False
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                self.entries = json.load(file)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def host(url):
+        return urllib.parse.urlparse(url).netloc.lower()
+
+    def lookup(self, url):
+        with self.lock:
+            entry = self.entries.get(self.host(url))
+            return dict(entry) if entry is not None else None
+
+    def entry(self, url):
+        entry = self.entries.setdefault(self.host(url), {
+            'rtt': None, 'throughput': None, 'failure_rate': 0.0,
+            'successes': 0, 'failures': 0,
+        })
+        entry['updated_at'] = time.time()
+        self.dirty = True
+        return entry
+
+    def smooth(self, previous, value):
+        if previous is None:
+            return value
+        return previous + self.SMOOTHING * (value - previous)
+
+    def record_probe(self, url, rtt):
+        with self.lock:
+            entry = self.entry(url)
+            entry['rtt'] = self.smooth(entry['rtt'], rtt)
+
+    def record_transfer(self, url, size, seconds):
+        with self.lock:
+            entry = self.entry(url)
+            entry['successes'] += 1
+            entry['failure_rate'] = self.smooth(entry['failure_rate'], 0.0)
+            if size > 0 and seconds > 0:
+                entry['throughput'] = self.smooth(entry['throughput'], size / seconds)
+
+    def record_failure(self, url):
+        with self.lock:
+            entry = self.entry(url)
+            entry['failures'] += 1
+            entry['failure_rate'] = self.smooth(entry['failure_rate'], 1.0)
+
+    def score(self, url, rtt=None):
+        entry = self.lookup(url) or {}
+        if rtt is None:
+            rtt = entry.get('rtt') or self.DEFAULT_RTT
+        score = rtt
+        if entry.get('throughput'):
+            score += self.REFERENCE_SIZE / entry['throughput']
+        return score * (1 + self.FAILURE_PENALTY * entry.get('failure_rate', 0.0))
+
+    def rank(self, urls, rtts=None):
+        rtts = rtts or {}
+        return sorted(urls, key=lambda url: self.score(url, rtts.get(url)))
+
+    def save(self, force=False):
+        with self.lock:
+            now = time.monotonic()
+            if not self.dirty or (not force and now - self.saved_at < self.SAVE_INTERVAL):
+                return
+            self.saved_at = now
+            self.dirty = False
+            data = json.dumps(self.entries, separators=(',', ':'))
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(tmp_path, self.path)
+
+def is_valid_program(program):
+    return isinstance(program, Mapping) and bool(program.get('name')) and bool(program.get('download_url'))
+
+class CatalogEntry(Mapping):
+    FIELDS = ('name', 'version', 'developer', 'category', 'download_url', 'icon_url', 'size', 'sha256')
+    FIELD_SET = frozenset(FIELDS)
+    KNOWN = FIELD_SET | {'description'}
+    MARSHAL_VERSION = 2
+    __slots__ = FIELDS + ('_description', '_extra')
+
+    def __init__(self, program):
+        get = program.get
+        self.name = get('name')
+        self.version = intern_string(get('version'))
+        self.developer = intern_string(get('developer'))
+        self.category = intern_string(get('category'))
+        self.download_url = get('download_url')
+        self.icon_url = get('icon_url')
+        self.size = get('size')
+        self.sha256 = get('sha256')
+
+        description = get('description')
+        self._description = description.encode('utf-8') if isinstance(description, str) else None
+        known = self.KNOWN if self._description is not None else self.FIELD_SET
+        extra = {key: value for key, value in program.items() if key not in known}
+        self._extra = marshal.dumps(extra, self.MARSHAL_VERSION) if extra else None
+
+    @property
+    def description(self):
+        return self._description.decode('utf-8') if self._description is not None else None
+
+    def extra(self):
+        return marshal.loads(self._extra) if self._extra is not None else {}
+
+    def get(self, key, default=None):
+        if key in self.FIELD_SET:
+            value = getattr(self, key)
+            return default if value is None else value
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __getitem__(self, key):
+        if key in self.FIELD_SET:
+            value = getattr(self, key)
+            if value is None:
+                raise KeyError(key)
+            return value
+        if key == 'description' and self._description is not None:
+            return self.description
+        return self.extra()[key]
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field) is not None:
+                yield field
+        if self._description is not None:
+            yield 'description'
+        if self._extra is not None:
+            yield from self.extra()
+
+    def __len__(self):
+        return sum(1 for key in self)
+
+    def __eq__(self, other):
+        if isinstance(other, CatalogEntry):
+            return (all(getattr(self, field) == getattr(other, field) for field in self.FIELDS)
+                    and self._description == other._description
+                    and (self._extra == other._extra or self.extra() == other.extra()))
+        return Mapping.__eq__(self, other)
+
+    def __repr__(self):
+        return f"CatalogEntry({self.name!r})"
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+        if self._description is not None:
+            data['description'] = self.description
+        data.update(self.extra())
+        return data
+
+def intern_string(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+class StreamingCatalogParser:
+    WHITESPACE = re.compile(r'[ \t\n\r]*')
+    INCOMPLETE = object()
+    DELTA_KEYS = ('added', 'updated', 'removed')
+
+    def __init__(self):
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buffer = ''
+        self.pos = 0
+        self.state = 'start'
+        self.key = None
+        self.array_key = None
+        self.array_target = None
+        self.found_programs = False
+        self.found_applications = False
+        self.buffered = {}
+        self.values = {}
+
+    def feed(self, data, final=False):
+        self.buffer = self.buffer[self.pos:] + self.text_decoder.decode(data, final)
+        self.pos = 0
+        ready = []
+        while self.step(ready, final):
+            pass
+        return ready
+
+    def finish(self):
+        ready = self.feed(b'', final=True)
+        if self.state != 'done':
+            raise ValueError("Данные каталога оборвались")
+        if not self.found_programs:
+            key = 'applications' if self.found_applications else 'first'
+            ready.extend(self.buffered.get(key, []))
+        return ready
+
+    def delta(self):
+        if self.found_programs or self.found_applications:
+            return None
+        if not any(key in self.buffered for key in self.DELTA_KEYS):
+            return None
+        return {key: self.buffered.get(key, []) for key in self.DELTA_KEYS}
+
+    def decode(self, pos, final):
+        try:
+            value, end = self.decoder.raw_decode(self.buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return self.INCOMPLETE, pos
+        if end >= len(self.buffer) and not final and not isinstance(value, (dict, list, str)):
+            return self.INCOMPLETE, pos
+        return value, end
+
+    def step(self, ready, final):
+        pos = self.WHITESPACE.match(self.buffer, self.pos).end()
+        self.pos = pos
+        if pos >= len(self.buffer) or self.state == 'done':
+            return False
+        char = self.buffer[pos]
+
+        if self.state == 'start':
+            if char == '[':
+                self.enter_array('')
+            elif char == '{':
+                self.state = 'key'
+            else:
+                value, end = self.decode(pos, final)
+                if value is self.INCOMPLETE:
+                    return False
+                self.pos = end
+                self.state = 'done'
+                return True
+            self.pos = pos + 1
+            return True
+
+        if self.state == 'key':
+            if char == ',':
+                self.pos = pos + 1
+                return True
+            if char == '}':
+                self.pos = pos + 1
+                self.state = 'done'
+                return True
+            key, end = self.decode(pos, final)
+            if key is self.INCOMPLETE:
+                return False
+            if not isinstance(key, str):
+                raise ValueError("Некорректный ключ в данных каталога")
+            self.key = key
+            self.pos = end
+            self.state = 'colon'
+            return True
+
+        if self.state == 'colon':
+            if char != ':':
+                raise ValueError("Некорректные данные каталога")
+            self.pos = pos + 1
+            self.state = 'value'
+            return True
+
+        if self.state == 'value':
+            if self.key == 'programs':
+                self.found_programs = True
+            elif self.key == 'applications':
+                self.found_applications = True
+
+            if char == '[':
+                self.enter_array(self.key)
+                self.pos = pos + 1
+                return True
+            value, end = self.decode(pos, final)
+            if value is self.INCOMPLETE:
+                return False
+            if not isinstance(value, (dict, list)):
+                self.values[self.key] = value
+            self.pos = end
+            self.state = 'key'
+            return True
+
+        if char == ',':
+            self.pos = pos + 1
+            return True
+        if char == ']':
+            self.pos = pos + 1
+            self.state = 'done' if self.array_key == '' else 'key'
+            return True
+        element, end = self.decode(pos, final)
+        if element is self.INCOMPLETE:
+            return False
+        self.pos = end
+        if self.array_target == 'stream':
+            if is_valid_program(element):
+                ready.append(CatalogEntry(element))
+        elif self.array_target == 'removed':
+            self.buffered['removed'].append(element)
+        elif self.array_target is not None and is_valid_program(element):
+            self.buffered[self.array_target].append(CatalogEntry(element))
+        return True
+
+    def enter_array(self, key):
+        self.state = 'array'
+        self.array_key = key
+        if key in ('', 'programs'):
+            self.array_target = 'stream'
+        elif key == 'applications':
+            self.array_target = None if self.found_programs else 'applications'
+        elif key in self.DELTA_KEYS:
+            self.array_target = key
+        elif self.found_programs or self.found_applications or 'first' in self.buffered:
+            self.array_target = None
+        else:
+            self.array_target = 'first'
+        if self.array_target not in (None, 'stream'):
+            self.buffered.setdefault(self.array_target, [])
+
+class SearchIndex:
+    TOKEN = re.compile(r'\w+')
+    FIELD_WEIGHTS = {'name': 8, 'developer': 4, 'category': 2, 'version': 2, 'description': 1}
+    FACETS = ('developer', 'category')
+    EXACT_BONUS = 3
+    PREFIX_BONUS = 2
+    FUZZY_MIN_LENGTH = 4
+    MAX_PREFIX_TOKENS = 2000
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.next_doc = 0
+        self.key_docs = {}
+        self.docs = {}
+        self.doc_rows = {}
+        self.postings = {}
+        self.facets = {name: {} for name in self.FACETS}
+        self.vocabulary = []
+        self.deletions = {}
+
+    @staticmethod
+    def doc_key(app):
+        return (app.get('name'), app.get('developer'), app.get('download_url'))
+
+    @classmethod
+    def signature(cls, app):
+        return tuple(str(app.get(field) or '') for field in cls.FIELD_WEIGHTS)
+
+    @classmethod
+    def tokenize(cls, text):
+        return cls.TOKEN.findall(text.lower())
+
+    @classmethod
+    def doc_tokens(cls, signature):
+        tokens = {}
+        for field, value in zip(cls.FIELD_WEIGHTS, signature):
+            weight = cls.FIELD_WEIGHTS[field]
+            for token in cls.tokenize(value):
+                if tokens.get(token, 0) < weight:
+                    tokens[token] = weight
+        return tokens
+
+    def update(self, apps):
+        with self.lock:
+            known = {key: self.docs[doc] for key, doc in self.key_docs.items()}
+
+        added = {}
+        rows = {}
+        seen = set()
+        for row, app in enumerate(apps):
+            key = self.doc_key(app)
+            if key in seen:
+                continue
+            seen.add(key)
+            signature = self.signature(app)
+            current = known.get(key)
+            if current is None or current[0] != signature:
+                facets = tuple(str(app.get(name) or '') for name in self.FACETS)
+                added[key] = (signature, tuple(self.doc_tokens(signature).items()), facets)
+            rows[key] = row
+
+        if not known:
+            fresh = SearchIndex()
+            for key, entry in added.items():
+                fresh.key_docs[key] = fresh.next_doc
+                fresh.add_doc(fresh.next_doc, entry)
+                fresh.next_doc += 1
+            fresh.doc_rows = {fresh.key_docs[key]: row for key, row in rows.items()}
+            fresh.rebuild_vocabulary()
+            with self.lock:
+                for name in ('next_doc', 'key_docs', 'docs', 'doc_rows', 'postings', 'facets',
+                             'vocabulary', 'deletions'):
+                    setattr(self, name, getattr(fresh, name))
+                self.generation += 1
+                return self.generation
+
+        with self.lock:
+            for key in set(self.key_docs) - seen:
+                self.remove_doc(self.key_docs.pop(key))
+            for key, entry in added.items():
+                doc = self.key_docs.get(key)
+                if doc is not None:
+                    self.remove_doc(doc)
+                doc = self.next_doc
+                self.next_doc += 1
+                self.key_docs[key] = doc
+                self.add_doc(doc, entry)
+            self.doc_rows = {self.key_docs[key]: row for key, row in rows.items()}
+            if added or len(seen) != len(known):
+                self.rebuild_vocabulary()
+            self.generation += 1
+            return self.generation
+
+    def add_doc(self, doc, entry):
+        self.docs[doc] = entry
+        signature, tokens, facets = entry
+        for token, weight in tokens:
+            self.postings.setdefault(token, {})[doc] = weight
+        for name, value in zip(self.FACETS, facets):
+            if value:
+                self.facets[name].setdefault(value, set()).add(doc)
+
+    def remove_doc(self, doc):
+        signature, tokens, facets = self.docs.pop(doc)
+        for token, weight in tokens:
+            posting = self.postings.get(token)
+            if posting is not None:
+                posting.pop(doc, None)
+                if not posting:
+                    del self.postings[token]
+        for name, value in zip(self.FACETS, facets):
+            docs = self.facets[name].get(value)
+            if docs is not None:
+                docs.discard(doc)
+                if not docs:
+                    del self.facets[name][value]
+
+    def rebuild_vocabulary(self):
+        self.vocabulary = sorted(self.postings)
+        self.deletions = {}
+        for token in self.vocabulary:
+            if len(token) >= self.FUZZY_MIN_LENGTH - 1:
+                for variant in self.deletion_variants(token):
+                    self.deletions.setdefault(variant, []).append(token)
+
+    @staticmethod
+    def deletion_variants(token):
+        return {token[:i] + token[i + 1:] for i in range(len(token))} | {token}
+
+    def facet_values(self, name):
+        with self.lock:
+            values = [(value, len(docs)) for value, docs in self.facets[name].items()]
+        return sorted(values, key=lambda item: item[0].lower())
+
+    def search(self, query, **facets):
+        with self.lock:
+            terms = self.tokenize(query)
+            candidates = None
+            for name, value in facets.items():
+                if value:
+                    docs = self.facets[name].get(value, set())
+                    candidates = docs if candidates is None else candidates & docs
+
+            if not terms:
+                if candidates is None:
+                    return self.generation, None
+                return self.generation, sorted(self.doc_rows[doc] for doc in candidates)
+
+            term_postings = sorted((self.term_postings(term) for term in dict.fromkeys(terms)),
+                                   key=lambda postings: sum(len(posting) for posting, bonus in postings))
+            scores = None
+            for postings in term_postings:
+                matches = self.match_postings(postings, candidates)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {doc: scores[doc] + score for doc, score in matches.items()}
+                if not scores:
+                    break
+                candidates = scores.keys()
+
+            doc_rows = self.doc_rows
+            ranked = sorted(zip(map(int.__neg__, scores.values()), map(doc_rows.__getitem__, scores)))
+            return self.generation, [row for score, row in ranked]
+
+    def term_postings(self, term):
+        postings = []
+        exact = self.postings.get(term)
+        if exact:
+            postings.append((exact, self.EXACT_BONUS))
+
+        start = bisect.bisect_right(self.vocabulary, term)
+        for token in self.vocabulary[start:start + self.MAX_PREFIX_TOKENS]:
+            if not token.startswith(term):
+                break
+            postings.append((self.postings[token], self.PREFIX_BONUS))
+
+        if not postings and len(term) >= self.FUZZY_MIN_LENGTH:
+            tokens = set()
+            for variant in self.deletion_variants(term):
+                tokens.update(self.deletions.get(variant, ()))
+            for token in tokens:
+                if edit_distance(term, token, 1) <= 1:
+                    postings.append((self.postings[token], 1))
+        return postings
+
+    def match_postings(self, postings, candidates=None):
+        matches = {}
+        for posting, bonus in postings:
+            if candidates is not None:
+                posting = {doc: posting[doc] for doc in posting.keys() & candidates}
+            self.merge_matches(matches, posting, bonus)
+        return matches
+
+    @staticmethod
+    def merge_matches(matches, posting, bonus):
+        if not matches:
+            matches.update(zip(posting, map(bonus.__mul__, posting.values())))
+            return
+        for doc, weight in posting.items():
+            score = weight * bonus
+            if matches.get(doc, 0) < score:
+                matches[doc] = score
+
+def edit_distance(first, second, max_distance):
+    before_previous = None
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1,
+                           previous[j - 1] + (first_char != second_char))
+            if (before_previous is not None and j > 1 and first_char == second[j - 2]
+                    and first[i - 2] == second_char):
+                distance = min(distance, before_previous[j - 2] + 1)
+            current.append(distance)
+        if min(current) > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    return previous[-1]
+
+def version_key(version):
+    match = re.fullmatch(r'v?(\d+)\.(\d+)(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?', str(version).strip())
+    if match is None:
+        raise ValueError(f"Некорректная версия: {version}")
+    major, minor, patch, prerelease = match.groups()
+    if prerelease is None:
+        pre_key = (1,)
+    else:
+        pre_key = (0,) + tuple((0, int(part), '') if part.isdigit() else (1, 0, part)
+                               for part in prerelease.split('.'))
+    return int(major), int(minor), int(patch or 0), pre_key
+
+DELTA_MAGIC = b"PLDELTA1"
+
+def make_delta(old_data, new_data):
+    old_lines = old_data.splitlines(keepends=True)
+    new_lines = new_data.splitlines(keepends=True)
+    old_offsets = [0]
+    for line in old_lines:
+        old_offsets.append(old_offsets[-1] + len(line))
+
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append(b'C' + struct.pack('>QQ', old_offsets[i1], old_offsets[i2] - old_offsets[i1]))
+        elif j2 > j1:
+            data = b''.join(new_lines[j1:j2])
+            ops.append(b'I' + struct.pack('>Q', len(data)) + data)
+    return DELTA_MAGIC + zlib.compress(b''.join(ops), 9)
+
+def apply_delta(old_data, delta):
+    if not delta.startswith(DELTA_MAGIC):
+        raise ValueError("Неизвестный формат патча")
+    ops = zlib.decompress(delta[len(DELTA_MAGIC):])
+    result = []
+    pos = 0
+    while pos < len(ops):
+        op = ops[pos:pos + 1]
+        if op == b'C':
+            offset, length = struct.unpack_from('>QQ', ops, pos + 1)
+            if offset + length > len(old_data):
+                raise ValueError("Патч не подходит к установленной версии")
+            result.append(old_data[offset:offset + length])
+            pos += 17
+        elif op == b'I':
+            length, = struct.unpack_from('>Q', ops, pos + 1)
+            result.append(ops[pos + 9:pos + 9 + length])
+            pos += 9 + length
+        else:
+            raise ValueError("Повреждённый патч")
+    return b''.join(result)
+
+def install_dir():
+    return Path(os.path.dirname(os.path.abspath(__file__)))
+
+def staged_update_dir():
+    return user_data_dir() / "updates" / "staged"
+
+def staged_update_version():
+    try:
+        with open(staged_update_dir() / "manifest.json", 'r', encoding='utf-8') as file:
+            return json.load(file).get('version')
+    except (OSError, ValueError):
+        return None
+
+def apply_staged_update(target_dir=None):
+    target_dir = Path(target_dir) if target_dir else install_dir()
+    staged_dir = staged_update_dir()
+    try:
+        with open(staged_dir / "manifest.json", 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if version_key(manifest['version']) <= version_key(APP_VERSION):
+            return None
+
+        staged_files = {}
+        for name, sha256 in manifest['files'].items():
+            with open(staged_dir / name, 'rb') as file:
+                data = file.read()
+            if hashlib.sha256(data).hexdigest() != sha256:
+                raise ValueError(f"Файл обновления {name} повреждён")
+            staged_files[name] = data
+
+        for name, data in staged_files.items():
+            tmp_path = target_dir / (name + '.update')
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+        for name in staged_files:
+            os.replace(target_dir / (name + '.update'), target_dir / name)
+        logger.info("Установлено обновление %s", manifest['version'])
+        return manifest['version']
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning("Не удалось установить обновление: %s", e)
+        return None
+    finally:
+        shutil.rmtree(staged_dir, ignore_errors=True)
+
+def parse_programs_data(data):
+    programs_data = []
+    
+    if isinstance(data, list):
+        programs_data = data
+    elif isinstance(data, dict):
+        if 'programs' in data:
+            programs_data = data['programs']
+        elif 'applications' in data:
+            programs_data = data['applications']
+        else:
+            for key, value in data.items():
+                if isinstance(value, list):
+                    programs_data = value
+                    break
+    
+    validated_data = []
+    for program in programs_data:
+        if is_valid_program(program):
+            validated_data.append(CatalogEntry(program))
+    
+    return validated_data
+
+class CatalogChanges:
+    def __init__(self, base, removed, updated, added, revision=None):
+        self.removed = sorted(removed)
+        self.updated = sorted(updated.items(), key=lambda item: item[0])
+        self.added = list(added)
+        self.revision = revision
+        self.programs = [updated.get(index, app) for index, app in enumerate(base) if index not in removed]
+        self.programs.extend(self.added)
+
+    def __bool__(self):
+        return bool(self.removed or self.updated or self.added)
+
+    @staticmethod
+    def identities(apps):
+        seen = Counter()
+        identities = []
+        for app in apps:
+            name = app['name']
+            identities.append((name, seen[name]))
+            seen[name] += 1
+        return identities
+
+    @staticmethod
+    def has_unique_names(apps):
+        names = [app['name'] for app in apps]
+        return len(set(names)) == len(names)
+
+    @classmethod
+    def from_delta(cls, base, delta, revision=None):
+        positions = {app['name']: index for index, app in enumerate(base)}
+        removed = set()
+        for item in delta['removed']:
+            name = item.get('name') if isinstance(item, Mapping) else item
+            if isinstance(name, str) and name in positions:
+                removed.add(positions[name])
+
+        updated = {}
+        added = {}
+        for app in delta['updated'] + delta['added']:
+            index = positions.get(app['name'])
+            if index is None:
+                added[app['name']] = app
+                continue
+            removed.discard(index)
+            if app != base[index]:
+                updated[index] = app
+        return cls(base, removed, updated, added.values(), revision)
+
+    @classmethod
+    def diff(cls, base, programs_data, revision=None):
+        positions = {identity: index for index, identity in enumerate(cls.identities(base))}
+        removed = set(range(len(base)))
+        updated = {}
+        added = []
+        for app, identity in zip(programs_data, cls.identities(programs_data)):
+            index = positions.get(identity)
+            if index is None:
+                added.append(app)
+                continue
+            removed.discard(index)
+            if app != base[index]:
+                updated[index] = app
+        return cls(base, removed, updated, added, revision)
+
+class CatalogLoader:
+    CHUNK_SIZE = 64 * 1024
+    BATCH_SIZE = 200
+    BATCH_INTERVAL = 0.1
+
+    def __init__(self, data_url, cache=None, on_rows=None, on_progress=None):
+        self.data_url = data_url
+        self.cache = cache or CatalogCache()
+        self.on_rows = on_rows
+        self.on_progress = on_progress
+        self.headers = {}
+        self.revision = None
+        self.delta = None
+
+    def load_cached(self):
+        meta = self.cache.load_meta(self.data_url)
+        if meta is None:
+            return None, None
+        cached_data = self.cache.load_programs()
+        if not cached_data:
+            return None, None
+        return meta, cached_data
+
+    def fetch(self, meta=None):
+        self.report_progress(0, "Загрузка данных...")
+        headers = self.cache.conditional_headers(meta) if meta is not None else {}
+        response = HttpClient.shared().get(self.data_url, headers=headers, stream=True)
+        self.headers = response.headers
+        if response.status_code == 304:
+            response.close()
+            self.cache.touch(self.data_url, response.headers)
+            self.report_progress(100, "Данные актуальны")
+            return None
+
+        response.raise_for_status()
+        programs_data = self.parse_programs_stream(response)
+        self.report_progress(100, "Загрузка завершена")
+        return programs_data
+
+    def delta_url(self, revision):
+        separator = '&' if urllib.parse.urlsplit(self.data_url).query else '?'
+        return f"{self.data_url}{separator}{urllib.parse.urlencode({'since': revision})}"
+
+    def fetch_changes(self, base, revision=None, meta=None):
+        programs_data = None
+        if revision is not None:
+            self.report_progress(0, "Загрузка изменений...")
+            headers = self.cache.conditional_headers(meta) if meta is not None else {}
+            response = HttpClient.shared().get(self.delta_url(revision), headers=headers, stream=True)
+            if response.status_code == 304:
+                response.close()
+                self.cache.touch(self.data_url, response.headers)
+                self.report_progress(100, "Данные актуальны")
+                return None
+            if response.ok:
+                self.headers = response.headers
+                programs_data = self.parse_programs_stream(response)
+                if self.delta is not None and CatalogChanges.has_unique_names(base):
+                    self.headers = {}
+                    self.report_progress(100, "Изменения загружены")
+                    return CatalogChanges.from_delta(base, self.delta, self.revision)
+                if self.delta is not None:
+                    logger.info("В каталоге есть приложения с одинаковыми названиями, загружается весь каталог")
+                    programs_data = None
+            else:
+                response.close()
+                logger.info("Сервер не отдал изменения с ревизии %s (%s), загружается весь каталог",
+                            revision, response.status_code)
+
+        if programs_data is None:
+            programs_data = self.fetch(meta)
+            if programs_data is None:
+                return None
+        if not programs_data:
+            raise ValueError("Нет данных о программах")
+        self.report_progress(100, "Загрузка завершена")
+        return CatalogChanges.diff(base, programs_data, self.revision)
+
+    def save(self, programs_data):
+        self.cache.save(self.data_url, self.headers, programs_data, self.revision)
+
+    def parse_programs_stream(self, response):
+        total_size = int(response.headers.get('content-length', 0))
+        parser = StreamingCatalogParser()
+        programs_data = []
+        batch = []
+        received = 0
+        last_emit = time.monotonic()
+
+        scheduler = BandwidthScheduler.shared()
+        for chunk in response.iter_content(chunk_size=self.CHUNK_SIZE):
+            scheduler.consume(len(chunk), BandwidthScheduler.PRIORITY_MEDIA)
+            received += len(chunk)
+            batch.extend(parser.feed(chunk))
+
+            now = time.monotonic()
+            if batch and (len(batch) >= self.BATCH_SIZE or now - last_emit >= self.BATCH_INTERVAL):
+                self.emit_rows(batch, programs_data)
+                batch = []
+                last_emit = now
+                if total_size > 0:
+                    progress = min(99, received * 100 // total_size)
+                    self.report_progress(progress, f"Загружено {len(programs_data)} приложений...")
+
+        batch.extend(parser.finish())
+        self.emit_rows(batch, programs_data)
+        self.revision = parser.values.get('revision')
+        self.delta = parser.delta()
+        return programs_data
+
+    def emit_rows(self, batch, programs_data):
+        programs_data.extend(batch)
+        if self.on_rows is not None and batch:
+            self.on_rows(batch)
+
+    def report_progress(self, progress, message):
+        if self.on_progress is not None:
+            self.on_progress(progress, message)
+
+def format_file_size(size_bytes):
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size_bytes < 1024.0:
+            return f"{size_bytes:.1f} {unit}"
+        size_bytes /= 1024.0
+    return f"{size_bytes:.1f} TB"
+
+def format_duration(seconds):
+    seconds = int(seconds)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+class RangeNotSupported(Exception):
+    pass
+
+class DownloadStopped(Exception):
+    pass
+
+class ChecksumMismatch(IOError):
+    pass
+
+class NotEnoughSpace(Exception):
+    pass
+
+class MirrorTooSlow(IOError):
+    pass
+
+class ThroughputMonitor:
+    WINDOW = 2.0
+    COLLAPSE_RATIO = 0.1
+    COLLAPSE_WINDOWS = 2
+
+    def __init__(self):
+        self.peak = 0.0
+        self.rate = 0.0
+        self.slow_windows = 0
+        self.window_started = time.monotonic()
+        self.size = 0
+        self.busy = 0.0
+
+    def add(self, size, busy):
+        self.size += size
+        self.busy += busy
+        now = time.monotonic()
+        if now - self.window_started < self.WINDOW:
+            return False
+
+        self.rate = self.size / max(self.busy, 1e-6)
+        self.window_started = now
+        self.size = 0
+        self.busy = 0.0
+        if self.rate < self.peak * self.COLLAPSE_RATIO:
+            self.slow_windows += 1
+        else:
+            self.slow_windows = 0
+            self.peak = max(self.peak, self.rate)
+        return self.slow_windows >= self.COLLAPSE_WINDOWS
+
+class ProgressiveHasher:
+    BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, path, algorithm='sha256'):
+        self.path = path
+        self.hash = hashlib.new(algorithm)
+        self.hashed = 0
+        self.available = 0
+        self.cancelled = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def advance(self, available):
+        with self.condition:
+            if available > self.available:
+                self.available = available
+                self.condition.notify_all()
+
+    def run(self):
+        buffer = bytearray(self.BLOCK_SIZE)
+        view = memoryview(buffer)
+        try:
+            with open(self.path, 'rb', buffering=0) as file:
+                while True:
+                    with self.condition:
+                        while not self.cancelled and self.hashed >= self.available:
+                            self.condition.wait()
+                        if self.cancelled:
+                            return
+                        end = self.available
+
+                    file.seek(self.hashed)
+                    while self.hashed < end:
+                        size = file.readinto(view[:min(self.BLOCK_SIZE, end - self.hashed)])
+                        if not size:
+                            raise IOError(f"Файл {self.path} короче ожидаемого")
+                        self.hash.update(view[:size])
+                        with self.condition:
+                            self.hashed += size
+                            self.condition.notify_all()
+        except Exception as e:
+            with self.condition:
+                self.error = e
+                self.condition.notify_all()
+
+    def hexdigest(self, size):
+        self.advance(size)
+        with self.condition:
+            while self.hashed < size and self.error is None and not self.cancelled:
+                self.condition.wait()
+        if self.error is not None:
+            raise self.error
+        return self.hash.hexdigest()
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.condition.notify_all()
+
+class InlineHasher:
+    def __init__(self, algorithm='sha256'):
+        self.hash = hashlib.new(algorithm)
+        self.hashed = 0
+
+    def update(self, chunk):
+        self.hash.update(chunk)
+        self.hashed += len(chunk)
+
+    def advance(self, available):
+        pass
+
+    def hexdigest(self, size):
+        if self.hashed != size:
+            raise IOError(f"Хэш посчитан по {self.hashed} из {size} байт")
+        return self.hash.hexdigest()
+
+    def cancel(self):
+        pass
+
+class Downloader:
+    SEGMENTS = 4
+    MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+    MIN_CHUNK_SIZE = 16 * 1024
+    MAX_CHUNK_SIZE = 1024 * 1024
+    CHUNK_READ_TIME = 0.05
+    MAX_ATTEMPTS = 3
+    STATE_SAVE_INTERVAL = 1.0
+    PROGRESS_INTERVAL = 0.1
+    SPEED_SMOOTHING = 0.2
+    FREE_SPACE_RESERVE = 16 * 1024 * 1024
+    IDENTITY_HEADERS = {'Accept-Encoding': 'identity'}
+    PROBE_TIMEOUT = (3, 5)
+    MIRROR_READ_TIMEOUT = 10
+
+    def __init__(self, url, save_path, segments=SEGMENTS, expected_sha256=None, expected_size=None, mirrors=None,
+                 on_progress=None):
+        self.url = url
+        self.fetch_url = url
+        self.candidates = [url] + [mirror for mirror in (mirrors or []) if mirror and mirror != url]
+        self.mirrors = [url]
+        self.probes = {}
+        self.mirror_stats = MirrorStats.shared()
+        self.timeout = HttpClient.TIMEOUTS['download']
+        self.save_path = save_path
+        self.expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        self.expected_size = int(expected_size) if expected_size else None
+        self.hasher = None
+        self.part_path, self.state_path = self.partial_paths(save_path)
+        self.segments = segments
+        self.state = None
+        self.state_saved_at = 0
+        self.total_size = 0
+        self.downloaded = 0
+        self.progress_emitted_at = 0
+        self.progress_emitted_bytes = 0
+        self.average_speed = None
+        self.progress_lock = threading.Lock()
+        self.abort_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.discard_on_stop = False
+        self.on_progress = on_progress
+
+    @staticmethod
+    def partial_paths(save_path):
+        return save_path + '.part', save_path + '.part.json'
+
+    def stop(self, discard=False):
+        self.discard_on_stop = discard
+        self.stop_event.set()
+
+    def run(self):
+        try:
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                try:
+                    self.download()
+                    break
+                except IOError:
+                    self.stop_hasher()
+                    self.save_state(force=True)
+                    if attempt == self.MAX_ATTEMPTS:
+                        raise
+                    if self.stop_event.wait(2 ** attempt):
+                        raise DownloadStopped()
+
+            self.stop_hasher()
+            os.replace(self.part_path, self.save_path)
+            self.remove_file(self.state_path)
+            return self.save_path
+        except DownloadStopped:
+            self.stop_hasher()
+            if self.discard_on_stop:
+                self.discard_partial()
+            else:
+                self.save_state(force=True)
+            raise
+        except Exception:
+            self.stop_hasher()
+            raise
+        finally:
+            self.mirror_stats.save(force=True)
+
+    def download(self):
+        if self.stop_event.is_set():
+            raise DownloadStopped()
+        remote = self.probe()
+        self.state = self.load_state(remote)
+        if self.state is None:
+            self.check_free_space(remote['total_size'])
+            self.state = self.new_state(remote)
+        else:
+            self.check_free_space(self.state['total_size'] - self.allocated_size())
+
+        done = sum(segment[2] for segment in self.state['segments'])
+        self.reset_progress(self.state['total_size'], done)
+        self.restart_hasher(inline=len(self.state['segments']) == 1 and done == 0)
+
+        for index, mirror in enumerate(self.mirrors):
+            self.fetch_url = mirror
+            started = time.monotonic()
+            downloaded = self.downloaded
+            try:
+                self.transfer(remote)
+            except IOError as e:
+                self.mirror_stats.record_failure(mirror)
+                if index == len(self.mirrors) - 1 or self.stop_event.is_set():
+                    raise
+                logger.warning("Зеркало %s недоступно (%s), переключаемся на %s", mirror, e, self.mirrors[index + 1])
+                self.save_state(force=True)
+                continue
+            self.mirror_stats.record_transfer(mirror, self.downloaded - downloaded, time.monotonic() - started)
+            break
+
+        self.verify()
+
+    def transfer(self, remote):
+        if len(self.state['segments']) > 1:
+            try:
+                self.download_segmented()
+                return
+            except RangeNotSupported:
+                self.discard_partial()
+                self.state = self.new_state(dict(remote, accepts_ranges=False))
+                self.reset_progress(self.state['total_size'], 0)
+
+        self.download_single()
+
+    def restart_hasher(self, inline=False):
+        self.stop_hasher()
+        if not self.expected_sha256:
+            return
+        if inline:
+            self.hasher = InlineHasher()
+        else:
+            self.hasher = ProgressiveHasher(self.part_path)
+            self.hasher.advance(self.contiguous_size())
+
+    def stop_hasher(self):
+        if self.hasher is not None:
+            self.hasher.cancel()
+            self.hasher = None
+
+    def contiguous_size(self):
+        size = 0
+        for start, end, done in self.state['segments']:
+            if start != size:
+                break
+            size = start + done
+            if size <= end:
+                break
+        return size
+
+    def verify(self):
+        size = os.path.getsize(self.part_path)
+        if self.expected_size and size != self.expected_size:
+            self.quarantine()
+            raise ChecksumMismatch(f"Размер файла не совпадает: ожидалось {self.expected_size}, получено {size} байт")
+
+        if self.hasher is not None:
+            digest = self.hasher.hexdigest(size)
+            self.stop_hasher()
+            if digest != self.expected_sha256:
+                self.quarantine()
+                raise ChecksumMismatch(f"Контрольная сумма не совпадает: ожидалось {self.expected_sha256}, получено {digest}")
+
+    def quarantine(self):
+        quarantine_dir = user_cache_dir() / "quarantine"
+        quarantine_dir.mkdir(parents=True, exist_ok=True)
+        file_name = os.path.basename(self.save_path)
+        for previous in quarantine_dir.glob(f"*_{glob.escape(file_name)}"):
+            self.remove_file(previous)
+        quarantine_path = quarantine_dir / f"{int(time.time())}_{file_name}"
+        os.replace(self.part_path, quarantine_path)
+        self.remove_file(self.state_path)
+        self.state = None
+        logger.warning("Повреждённый файл перемещён в %s", quarantine_path)
+
+    def probe(self):
+        if len(self.candidates) == 1:
+            remote = self.probe_mirror(self.url, HttpClient.TIMEOUTS['download'])
+            self.mirrors = [remote['url']]
+            self.probes = {remote['url']: remote}
+            return remote
+
+        with ThreadPoolExecutor(max_workers=len(self.candidates)) as executor:
+            probes = list(executor.map(lambda url: self.probe_mirror(url, self.PROBE_TIMEOUT), self.candidates))
+
+        self.probes = {}
+        rtts = {}
+        for remote in probes:
+            self.probes.setdefault(remote['url'], remote)
+            if remote['rtt'] is None:
+                self.mirror_stats.record_failure(remote['url'])
+            else:
+                self.mirror_stats.record_probe(remote['url'], remote['rtt'])
+                rtts[remote['url']] = remote['rtt']
+
+        ranked = self.mirror_stats.rank(list(rtts), rtts)
+        best = self.probes[ranked[0]] if ranked else probes[0]
+        if best['total_size']:
+            ranked = [url for url in ranked if self.probes[url]['total_size'] in (0, best['total_size'])]
+        unreachable = [url for url, remote in self.probes.items() if remote['rtt'] is None]
+        self.mirrors = ranked + unreachable
+        self.timeout = (HttpClient.TIMEOUTS['download'][0], self.MIRROR_READ_TIMEOUT)
+        logger.debug("Зеркала по скорости: %s", ', '.join(self.mirrors))
+        return best
+
+    def probe_mirror(self, url, timeout):
+        remote = {'url': url, 'total_size': 0, 'accepts_ranges': False,
+                  'etag': None, 'last_modified': None, 'rtt': None}
+        started = time.monotonic()
+        try:
+            response = HttpClient.shared().head(url, 'download', headers=self.IDENTITY_HEADERS, timeout=timeout)
+            response.raise_for_status()
+        except Exception:
+            return remote
+
+        remote['rtt'] = time.monotonic() - started
+        remote['url'] = response.url
+        remote['total_size'] = int(response.headers.get('content-length', 0))
+        remote['accepts_ranges'] = response.headers.get('accept-ranges', '').lower() == 'bytes'
+        remote['etag'] = response.headers.get('etag')
+        remote['last_modified'] = response.headers.get('last-modified')
+        return remote
+
+    def load_state(self, remote):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as file:
+                state = json.load(file)
+        except (OSError, ValueError):
+            state = None
+
+        if not state or not os.path.exists(self.part_path):
+            self.discard_partial()
+            return None
+
+        state.setdefault('source', remote['url'])
+        source = self.probes.get(state['source'])
+        if source is not None and source.get('rtt') is not None:
+            remote = source
+        same_file = (
+            state.get('url') == self.url
+            and remote['accepts_ranges']
+            and state.get('total_size') == remote['total_size']
+            and (state.get('etag') or state.get('last_modified'))
+            and state.get('etag') == remote['etag']
+            and state.get('last_modified') == remote['last_modified']
+        )
+        if not same_file:
+            self.discard_partial()
+            return None
+
+        return state
+
+    def new_state(self, remote):
+        total_size = remote['total_size']
+        segments = [[0, total_size - 1, 0]]
+
+        if remote['accepts_ranges'] and self.segments > 1 and total_size >= self.MIN_SEGMENT_SIZE * 2:
+            segment_count = min(self.segments, total_size // self.MIN_SEGMENT_SIZE)
+            segment_size = total_size // segment_count
+            segments = []
+            for i in range(segment_count):
+                start = i * segment_size
+                end = total_size - 1 if i == segment_count - 1 else start + segment_size - 1
+                segments.append([start, end, 0])
+
+        self.allocate_part(total_size)
+        return {
+            'url': self.url,
+            'source': remote['url'],
+            'etag': remote['etag'],
+            'last_modified': remote['last_modified'],
+            'total_size': total_size,
+            'segments': segments,
+        }
+
+    def allocate_part(self, total_size):
+        with open(self.part_path, 'wb') as file:
+            if total_size <= 0:
+                return
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(file.fileno(), 0, total_size)
+                    return
+                except OSError as e:
+                    if e.errno == errno.ENOSPC:
+                        raise NotEnoughSpace(self.free_space_message(total_size))
+            file.truncate(total_size)
+
+    def allocated_size(self):
+        try:
+            stat = os.stat(self.part_path)
+        except OSError:
+            return 0
+        if hasattr(stat, 'st_blocks'):
+            return min(stat.st_size, stat.st_blocks * 512)
+        return sum(segment[2] for segment in self.state['segments'])
+
+    def check_free_space(self, required):
+        if required <= 0:
+            return
+        directory = os.path.dirname(os.path.abspath(self.save_path))
+        try:
+            free = shutil.disk_usage(directory).free
+        except OSError:
+            return
+        if free < required + self.FREE_SPACE_RESERVE:
+            raise NotEnoughSpace(self.free_space_message(required, free))
+
+    def free_space_message(self, required, free=None):
+        directory = os.path.dirname(os.path.abspath(self.save_path))
+        if free is None:
+            free = shutil.disk_usage(directory).free
+        return (f"Недостаточно места в {directory}: нужно {format_file_size(required)}, "
+                f"свободно {format_file_size(free)}")
+
+    def if_range_validator(self):
+        if self.fetch_url != self.state.get('source'):
+            return None
+        etag = self.state.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return self.state.get('last_modified')
+
+    def download_single(self):
+        segment = self.state['segments'][0]
+        headers = dict(self.IDENTITY_HEADERS)
+        validator = self.if_range_validator()
+        if segment[2] > 0 and (validator or self.fetch_url != self.state.get('source')):
+            headers['Range'] = f'bytes={segment[2]}-'
+            if validator:
+                headers['If-Range'] = validator
+
+        response = HttpClient.shared().get(self.fetch_url, 'download', headers=headers, stream=True,
+                                           timeout=self.timeout)
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            self.check_content_range(response)
+        else:
+            with self.progress_lock:
+                segment[2] = 0
+                self.state['source'] = self.fetch_url
+                self.state['etag'] = response.headers.get('etag')
+                self.state['last_modified'] = response.headers.get('last-modified')
+            total_size = int(response.headers.get('content-length', 0))
+            self.state['total_size'] = total_size
+            segment[1] = total_size - 1
+            self.check_free_space(total_size)
+            self.allocate_part(total_size)
+            self.reset_progress(total_size, 0)
+
+        if segment[2] == 0:
+            self.restart_hasher(inline=True)
+        elif isinstance(self.hasher, InlineHasher) and self.hasher.hashed != segment[2]:
+            self.restart_hasher()
+        hasher = self.hasher if isinstance(self.hasher, InlineHasher) else None
+
+        with response, open(self.part_path, 'r+b', buffering=0) as file:
+            file.seek(segment[2])
+            for chunk in self.iter_chunks(response):
+                if self.stop_event.is_set():
+                    response.close()
+                    raise DownloadStopped()
+                if chunk:
+                    file.write(chunk)
+                    if hasher is not None:
+                        hasher.update(chunk)
+                    self.add_progress(segment, len(chunk))
+
+        if self.state['total_size'] > 0 and segment[2] < self.state['total_size']:
+            raise IOError(f"Соединение оборвалось на {segment[2]} из {self.state['total_size']} байт")
+
+    def check_content_range(self, response):
+        total = response.headers.get('content-range', '').rpartition('/')[2]
+        if total.isdigit() and self.state['total_size'] and int(total) != self.state['total_size']:
+            response.close()
+            raise IOError(f"Зеркало {self.fetch_url} отдаёт другой файл: {total} байт вместо {self.state['total_size']}")
+
+    def download_segmented(self):
+        self.abort_event.clear()
+        pending = [segment for segment in self.state['segments'] if segment[0] + segment[2] <= segment[1]]
+        if not pending:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = [executor.submit(self.download_segment, segment) for segment in pending]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except Exception:
+                self.abort_event.set()
+                raise
+
+    def download_segment(self, segment):
+        start, end = segment[0], segment[1]
+        headers = dict(self.IDENTITY_HEADERS, Range=f'bytes={start + segment[2]}-{end}')
+        validator = self.if_range_validator()
+        if validator:
+            headers['If-Range'] = validator
+
+        response = HttpClient.shared().get(self.fetch_url, 'download', headers=headers, stream=True,
+                                           timeout=self.timeout)
+        response.raise_for_status()
+        if response.status_code != 206:
+            response.close()
+            raise RangeNotSupported(self.fetch_url)
+        self.check_content_range(response)
+
+        expected = end - start + 1
+        with response, open(self.part_path, 'r+b', buffering=0) as file:
+            file.seek(start + segment[2])
+            for chunk in self.iter_chunks(response):
+                if self.stop_event.is_set():
+                    response.close()
+                    raise DownloadStopped()
+                if self.abort_event.is_set():
+                    response.close()
+                    return
+                if chunk:
+                    chunk = chunk[:expected - segment[2]]
+                    file.write(chunk)
+                    self.add_progress(segment, len(chunk))
+                    if segment[2] >= expected:
+                        break
+
+        if segment[2] < expected:
+            raise IOError(f"Сегмент {start}-{end} оборвался на {segment[2]} из {expected} байт")
+
+    def iter_chunks(self, response):
+        import requests
+        import urllib3
+        monitor = ThroughputMonitor()
+        chunk_size = self.MIN_CHUNK_SIZE
+        while True:
+            started = time.monotonic()
+            try:
+                chunk = response.raw.read(chunk_size, decode_content=True)
+            except urllib3.exceptions.HTTPError as e:
+                raise requests.exceptions.ConnectionError(e)
+            if not chunk:
+                return
+            read_time = time.monotonic() - started
+            yield chunk
+            chunk_size = self.pace(monitor, chunk_size, len(chunk), started, read_time)
+
+    def has_fallback_mirror(self):
+        return self.fetch_url in self.mirrors and self.mirrors.index(self.fetch_url) < len(self.mirrors) - 1
+
+    def pace(self, monitor, chunk_size, received, started, read_time):
+        if monitor.add(received, read_time) and self.has_fallback_mirror():
+            raise MirrorTooSlow(f"Скорость зеркала {self.fetch_url} упала до {format_file_size(monitor.rate)}/с")
+        scheduler = BandwidthScheduler.shared()
+        scheduler.consume(received, BandwidthScheduler.PRIORITY_DOWNLOAD, self.stop_event)
+        chunk_size = self.next_chunk_size(chunk_size, received, time.monotonic() - started)
+        limit = scheduler.chunk_limit(BandwidthScheduler.PRIORITY_DOWNLOAD)
+        return min(chunk_size, limit) if limit else chunk_size
+
+    def next_chunk_size(self, chunk_size, received, elapsed):
+        if received < chunk_size:
+            return chunk_size
+        if elapsed < self.CHUNK_READ_TIME / 2:
+            return min(chunk_size * 2, self.MAX_CHUNK_SIZE)
+        if elapsed > self.CHUNK_READ_TIME * 2:
+            return max(chunk_size // 2, self.MIN_CHUNK_SIZE)
+        return chunk_size
+
+    def save_state(self, force=False):
+        if self.state is None:
+            return
+        with self.progress_lock:
+            now = time.monotonic()
+            if not force and now - self.state_saved_at < self.STATE_SAVE_INTERVAL:
+                return
+            self.state_saved_at = now
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self.state, file)
+            os.replace(tmp_path, self.state_path)
+
+    def discard_partial(self):
+        self.remove_file(self.part_path)
+        self.remove_file(self.state_path)
+
+    def remove_file(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def reset_progress(self, total_size, downloaded):
+        with self.progress_lock:
+            self.total_size = total_size
+            self.downloaded = downloaded
+            self.progress_emitted_at = time.monotonic()
+            self.progress_emitted_bytes = downloaded
+            self.average_speed = None
+            payload = self.progress_payload(0)
+        self.emit_progress(payload)
+
+    def add_progress(self, segment, size):
+        with self.progress_lock:
+            segment[2] += size
+            self.downloaded += size
+            hasher = self.hasher
+            hashable = self.contiguous_size() if hasher is not None else 0
+
+            payload = None
+            now = time.monotonic()
+            elapsed = now - self.progress_emitted_at
+            if elapsed >= self.PROGRESS_INTERVAL:
+                speed = (self.downloaded - self.progress_emitted_bytes) / elapsed
+                if self.average_speed is None:
+                    self.average_speed = speed
+                else:
+                    self.average_speed += self.SPEED_SMOOTHING * (speed - self.average_speed)
+                self.progress_emitted_at = now
+                self.progress_emitted_bytes = self.downloaded
+                payload = self.progress_payload(speed)
+
+        if hasher is not None:
+            hasher.advance(hashable)
+        self.save_state()
+        if payload is not None:
+            self.emit_progress(payload)
+
+    def emit_progress(self, payload):
+        if self.on_progress is not None:
+            self.on_progress(payload)
+
+    def progress_payload(self, speed):
+        average_speed = self.average_speed or 0
+        progress = -1
+        eta = None
+        if self.total_size > 0:
+            progress = min(100, int(self.downloaded * 100 / self.total_size))
+            if average_speed > 0:
+                eta = max(0, self.total_size - self.downloaded) / average_speed
+        return {
+            'progress': progress,
+            'downloaded': self.downloaded,
+            'total': self.total_size,
+            'speed': speed,
+            'average_speed': average_speed,
+            'eta': eta,
+        }
+
+def download_path_for(app_data, downloads_dir=None, taken=()):
+    downloads_dir = Path(downloads_dir) if downloads_dir else Path.home() / "Downloads"
+    downloads_dir.mkdir(parents=True, exist_ok=True)
+
+    download_url = app_data.get('download_url', '')
+    filename = os.path.basename(urllib.parse.urlparse(download_url).path)
+    if not filename:
+        filename = f"{app_data['name'].replace(' ', '_')}.exe"
+
+    path = downloads_dir / filename
+    taken = set(taken)
+    number = 2
+    while str(path) in taken:
+        path = downloads_dir / f"{Path(filename).stem} ({number}){Path(filename).suffix}"
+        number += 1
+    return str(path)
@@ -0,0 +1,765 @@
+import os
+import requests
+import json
+import logging
+import time
+import hashlib
+import shutil
+import struct
+import zlib
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QDialog, QProgressBar,
+                             QMessageBox, QScrollArea, QFrame, QTextEdit, QLineEdit, QCheckBox, QTableWidget,
+                             QTableWidgetItem, QHeaderView, QFileDialog)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QRect
+from PyQt5.QtGui import QFont, QColor
+from pathlib import Path
+from core import (HttpClient, BandwidthScheduler, MediaCache, NetworkTracer, apply_delta, install_dir,
+                  staged_update_dir, format_file_size, format_duration)
+from gui import IconLoader, SizeService, DownloadJob
+
+logger = logging.getLogger(__name__)
+
+class SelfUpdater(QThread):
+    progress_updated = pyqtSignal(int, str)
+    update_staged = pyqtSignal(str)
+    update_failed = pyqtSignal(str)
+
+    def __init__(self, update_data, target_dir=None):
+        super().__init__()
+        self.update_data = update_data
+        self.target_dir = Path(target_dir) if target_dir else install_dir()
+        self.transferred = 0
+
+    @staticmethod
+    def can_update(update_data, target_dir=None):
+        target_dir = Path(target_dir) if target_dir else install_dir()
+        return bool(update_data.get('files')) and os.access(target_dir, os.W_OK)
+
+    def run(self):
+        try:
+            version = self.update_data['version']
+            files = self.update_data['files']
+            staging_dir = staged_update_dir().with_name("staging")
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            staging_dir.mkdir(parents=True)
+
+            full_size = 0
+            for i, (name, info) in enumerate(files.items()):
+                if os.path.basename(name) != name:
+                    raise ValueError(f"Недопустимое имя файла в обновлении: {name}")
+                self.progress_updated.emit(i * 100 // len(files), f"Загрузка {name}...")
+                data = self.fetch_file(name, info)
+                with open(staging_dir / name, 'wb') as file:
+                    file.write(data)
+                full_size += info.get('size') or len(data)
+
+            with open(staging_dir / "manifest.json", 'w', encoding='utf-8') as file:
+                json.dump({'version': version,
+                           'files': {name: info['sha256'] for name, info in files.items()}}, file)
+
+            staged_dir = staged_update_dir()
+            shutil.rmtree(staged_dir, ignore_errors=True)
+            os.replace(staging_dir, staged_dir)
+
+            saved = max(0, 100 - self.transferred * 100 // full_size) if full_size else 0
+            self.progress_updated.emit(100, f"Загружено {format_file_size(self.transferred)} (экономия {saved}%)")
+            self.update_staged.emit(version)
+        except Exception as e:
+            self.update_failed.emit(str(e))
+
+    def fetch_file(self, name, info):
+        expected = info['sha256']
+        current = None
+        try:
+            with open(self.target_dir / name, 'rb') as file:
+                current = file.read()
+        except OSError:
+            pass
+
+        if current is not None:
+            current_sha256 = hashlib.sha256(current).hexdigest()
+            if current_sha256 == expected:
+                return current
+
+            delta_info = info.get('deltas', {}).get(current_sha256)
+            if delta_info:
+                try:
+                    delta = self.download(delta_info['url'], delta_info.get('sha256'))
+                    data = apply_delta(current, delta)
+                    if hashlib.sha256(data).hexdigest() == expected:
+                        return data
+                    logger.warning("Патч для %s дал неверный результат, скачиваем целиком", name)
+                except (requests.RequestException, ValueError, zlib.error, struct.error) as e:
+                    logger.warning("Не удалось применить патч для %s: %s", name, e)
+
+        data = self.download(info['url'], expected)
+        return data
+
+    def download(self, url, sha256=None):
+        with HttpClient.shared().get(url, 'download', stream=True) as response:
+            response.raise_for_status()
+            data = BandwidthScheduler.shared().read(response, BandwidthScheduler.PRIORITY_DOWNLOAD)
+        self.transferred += len(data)
+        if sha256 and hashlib.sha256(data).hexdigest() != sha256:
+            raise ValueError(f"Контрольная сумма не совпадает: {url}")
+        return data
+
+class UpdateDialog(QDialog):
+    def __init__(self, update_data, parent=None):
+        super().__init__(parent)
+        self.update_data = update_data
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle("Новая версия")
+        self.setFixedSize(500, 400)
+        
+        layout = QVBoxLayout()
+        
+        title_label = QLabel("Вышло обновление Pidorlauncher")
+        title_label.setFont(QFont("Arial", 16, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+        
+        version_layout = QHBoxLayout()
+        version_layout.addWidget(QLabel("Новая версия:"))
+        version_label = QLabel(self.update_data.get('version', 'Unknown'))
+        version_label.setFont(QFont("Arial", 12, QFont.Bold))
+        version_layout.addWidget(version_label)
+        version_layout.addStretch()
+        layout.addLayout(version_layout)
+        
+        changelog_label = QLabel("Изменения:")
+        changelog_label.setFont(QFont("Arial", 12, QFont.Bold))
+        layout.addWidget(changelog_label)
+        
+        changelog_text = QTextEdit()
+        changelog_text.setPlainText(self.update_data.get('changelog', 'Нет информации об изменениях'))
+        changelog_text.setReadOnly(True)
+        changelog_text.setMaximumHeight(150)
+        layout.addWidget(changelog_text)
+        
+        self.update_progress = QProgressBar()
+        self.update_progress.setRange(0, 100)
+        self.update_progress.hide()
+        layout.addWidget(self.update_progress)
+        
+        self.update_status = QLabel()
+        self.update_status.setStyleSheet("color: #7f8c8d;")
+        self.update_status.hide()
+        layout.addWidget(self.update_status)
+        
+        button_layout = QHBoxLayout()
+        
+        self.download_btn = QPushButton("Скачать")
+        self.download_btn.setFixedSize(150, 40)
+        self.download_btn.clicked.connect(self.download_update)
+        
+        later_btn = QPushButton("Не")
+        later_btn.setFixedSize(120, 40)
+        later_btn.clicked.connect(self.reject)
+        
+        ignore_btn = QPushButton("Выключи его нахуй")
+        ignore_btn.setFixedSize(120, 40)
+        ignore_btn.clicked.connect(self.ignore_update)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(self.download_btn)
+        button_layout.addWidget(later_btn)
+        button_layout.addWidget(ignore_btn)
+        
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+    
+    def download_update(self):
+        if not SelfUpdater.can_update(self.update_data):
+            self.open_download_page()
+            return
+        
+        self.download_btn.setEnabled(False)
+        self.update_progress.show()
+        self.update_status.show()
+        self.updater = SelfUpdater(self.update_data)
+        self.updater.progress_updated.connect(self.on_update_progress)
+        self.updater.update_staged.connect(self.on_update_staged)
+        self.updater.update_failed.connect(self.on_update_failed)
+        self.updater.start()
+    
+    def open_download_page(self):
+        import webbrowser
+        download_url = self.update_data.get('download_url', '')
+        if download_url:
+            webbrowser.open(download_url)
+        self.accept()
+    
+    def on_update_progress(self, progress, status):
+        self.update_progress.setValue(progress)
+        self.update_status.setText(status)
+    
+    def on_update_staged(self, version):
+        QMessageBox.information(self, "Обновление",
+                                f"Версия {version} загружена и будет установлена при следующем запуске.\n"
+                                f"{self.update_status.text()}")
+        self.accept()
+    
+    def on_update_failed(self, error_msg):
+        NetworkTracer.shared().failure(None, f"Ошибка обновления: {error_msg}")
+        QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить обновление: {error_msg}\n"
+                                            "Откроется страница загрузки.")
+        self.open_download_page()
+    
+    def ignore_update(self):
+        self.accept()
+
+class AppDetailsDialog(QDialog):
+    SCREENSHOT_WORKERS = 3
+    SCREENSHOT_MEMORY_BUDGET = 16 * 1024 * 1024
+    SCREENSHOT_PREFETCH = 400
+
+    def __init__(self, app_data, parent=None):
+        super().__init__(parent)
+        self.app_data = app_data
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.screenshot_urls = []
+        self.screenshot_labels = []
+        self.screenshot_pixmaps = {}
+        self.screenshot_requested = set()
+        self.screenshot_loader = None
+        self.init_ui()
+        
+    def init_ui(self):
+        self.setWindowTitle(f"{self.app_data['name']} - Подробнее")
+        self.setMinimumSize(900, 700)
+        
+        layout = QVBoxLayout()
+        
+        header_layout = QHBoxLayout()
+        
+        self.icon_label = QLabel()
+        self.icon_label.setFixedSize(96, 96)
+        self.icon_label.setStyleSheet("border: 2px solid #555; border-radius: 8px; padding: 5px; background: #333;")
+        header_layout.addWidget(self.icon_label)
+        
+        info_layout = QVBoxLayout()
+        self.title_label = QLabel(self.app_data['name'])
+        self.title_label.setFont(QFont("Arial", 18, QFont.Bold))
+        
+        version_text = f"Версия: {self.app_data.get('version', 'Не указана')}"
+        developer = self.app_data.get('developer')
+        if developer:
+            version_text += f" | Разработчик: {developer}"
+        
+        self.version_label = QLabel(version_text)
+        self.version_label.setFont(QFont("Arial", 12))
+        
+        self.size_label = QLabel("Размер: загрузка...")
+        self.size_label.setFont(QFont("Arial", 10))
+        self.size_label.setStyleSheet("color: #666;")
+        
+        info_layout.addWidget(self.title_label)
+        info_layout.addWidget(self.version_label)
+        info_layout.addWidget(self.size_label)
+        info_layout.addStretch()
+        
+        header_layout.addLayout(info_layout)
+        header_layout.addStretch()
+        
+        layout.addLayout(header_layout)
+        
+        line = QFrame()
+        line.setFrameShape(QFrame.HLine)
+        line.setFrameShadow(QFrame.Sunken)
+        layout.addWidget(line)
+        
+        desc_label = QLabel("Описание:")
+        desc_label.setFont(QFont("Arial", 12, QFont.Bold))
+        layout.addWidget(desc_label)
+        
+        description = QTextEdit()
+        description.setPlainText(self.app_data.get('description', 'Описание отсутствует'))
+        description.setReadOnly(True)
+        description.setMaximumHeight(100)
+        description.setStyleSheet("background: #2d2d2d; border: 1px solid #555; border-radius: 5px; padding: 8px; color: white;")
+        layout.addWidget(description)
+        
+        screenshots_label = QLabel("Скриншоты:")
+        screenshots_label.setFont(QFont("Arial", 12, QFont.Bold))
+        layout.addWidget(screenshots_label)
+        
+        self.scroll_area = QScrollArea()
+        self.scroll_area.setWidgetResizable(True)
+        self.scroll_widget = QWidget()
+        self.screenshots_layout = QHBoxLayout()
+        self.screenshots_layout.setSpacing(10)
+        self.scroll_widget.setLayout(self.screenshots_layout)
+        self.scroll_area.setWidget(self.scroll_widget)
+        self.scroll_area.setMinimumHeight(250)
+        self.scroll_area.setStyleSheet("background: #2d2d2d; border: 1px solid #555; border-radius: 5px;")
+        self.visibility_timer = QTimer(self)
+        self.visibility_timer.setSingleShot(True)
+        self.visibility_timer.setInterval(0)
+        self.visibility_timer.timeout.connect(self.load_visible_screenshots)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.schedule_visible_screenshots)
+        self.scroll_area.horizontalScrollBar().rangeChanged.connect(self.schedule_visible_screenshots)
+        layout.addWidget(self.scroll_area)
+        
+        button_layout = QHBoxLayout()
+        
+        download_btn = QPushButton("Скачать")
+        download_btn.setFixedSize(180, 45)
+        download_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #28a745;
+                color: white;
+                font-weight: bold;
+                border: none;
+                border-radius: 8px;
+                font-size: 14px;
+            }
+            QPushButton:hover {
+                background-color: #218838;
+            }
+            QPushButton:disabled {
+                background-color: #6c757d;
+                color: #ccc;
+            }
+        """)
+        download_btn.clicked.connect(self.start_download)
+        
+        if not self.app_data.get('download_url'):
+            download_btn.setEnabled(False)
+            download_btn.setToolTip("Ссылка для скачивания недоступна")
+        
+        close_btn = QPushButton("✕ Закрыть")
+        close_btn.setFixedSize(120, 45)
+        close_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #6c757d;
+                color: white;
+                font-weight: bold;
+                border: none;
+                border-radius: 8px;
+            }
+            QPushButton:hover {
+                background-color: #5a6268;
+            }
+        """)
+        close_btn.clicked.connect(self.reject)
+        
+        button_layout.addStretch()
+        button_layout.addWidget(download_btn)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        
+        self.setLayout(layout)
+        
+        QTimer.singleShot(100, self.load_app_data)
+    
+    def load_app_data(self):
+        icon_url = self.app_data.get('icon_url')
+        if icon_url:
+            self.icon_loader = IconLoader('icon96', 1, parent=self,
+                                          bandwidth_priority=BandwidthScheduler.PRIORITY_MEDIA)
+            self.icon_loader.icon_ready.connect(self.on_icon_ready)
+            self.icon_loader.icon_failed.connect(self.on_icon_failed)
+            self.icon_loader.request('icon', icon_url, IconLoader.PRIORITY_VISIBLE)
+        else:
+            self.icon_label.setText("📁\nНет иконки")
+        
+        download_url = self.app_data.get('download_url')
+        if download_url:
+            size_service = SizeService.shared()
+            if size_service.has_size(download_url):
+                self.show_size(size_service.size_for(download_url))
+            else:
+                size_service.size_ready.connect(self.on_size_checked)
+                size_service.size_failed.connect(self.on_size_check_failed)
+                size_service.request(download_url, SizeService.PRIORITY_VISIBLE)
+        
+        self.screenshot_urls = list(self.app_data.get('screenshots', []))
+        self.screenshot_loader = IconLoader('screenshot', self.SCREENSHOT_WORKERS, parent=self, use_pixmap_cache=False,
+                                            bandwidth_priority=BandwidthScheduler.PRIORITY_MEDIA)
+        self.screenshot_loader.icon_ready.connect(self.on_screenshot_ready)
+        self.screenshot_loader.icon_failed.connect(self.on_screenshot_failed)
+        for screenshot_url in self.screenshot_urls:
+            screenshot_label = QLabel("Загрузка...")
+            screenshot_label.setAlignment(Qt.AlignCenter)
+            screenshot_label.setStyleSheet("border: 2px solid #555; border-radius: 5px; padding: 3px; background: #333;")
+            screenshot_label.setFixedSize(*MediaCache.VARIANTS['screenshot'])
+            self.screenshots_layout.addWidget(screenshot_label)
+            self.screenshot_labels.append(screenshot_label)
+        self.schedule_visible_screenshots()
+    
+    def schedule_visible_screenshots(self, *args):
+        self.visibility_timer.start()
+    
+    def visible_screenshot_rect(self):
+        viewport = self.scroll_area.viewport()
+        visible = QRect(-self.scroll_widget.x(), 0, viewport.width(), viewport.height())
+        return visible.adjusted(-self.SCREENSHOT_PREFETCH, 0, self.SCREENSHOT_PREFETCH, 0)
+    
+    def load_visible_screenshots(self):
+        if self.screenshot_loader is None:
+            return
+        self.screenshots_layout.activate()
+        if self.scroll_widget.width() < self.scroll_widget.sizeHint().width():
+            return
+        visible = self.visible_screenshot_rect()
+        for index, label in enumerate(self.screenshot_labels):
+            if index in self.screenshot_requested or label.isHidden():
+                continue
+            if label.geometry().intersects(visible):
+                self.screenshot_requested.add(index)
+                self.screenshot_loader.request(index, self.screenshot_urls[index], IconLoader.PRIORITY_VISIBLE)
+    
+    def screenshot_memory(self):
+        return sum(pixmap.width() * pixmap.height() * pixmap.depth() // 8
+                   for pixmap in self.screenshot_pixmaps.values())
+    
+    def trim_screenshots(self):
+        visible = self.visible_screenshot_rect()
+        center = visible.center().x()
+        offscreen = [index for index in self.screenshot_pixmaps
+                     if not self.screenshot_labels[index].geometry().intersects(visible)]
+        offscreen.sort(key=lambda index: abs(self.screenshot_labels[index].geometry().center().x() - center), reverse=True)
+        
+        for index in offscreen:
+            if self.screenshot_memory() <= self.SCREENSHOT_MEMORY_BUDGET:
+                break
+            del self.screenshot_pixmaps[index]
+            self.screenshot_requested.discard(index)
+            self.screenshot_loader.forget(index)
+            self.screenshot_labels[index].clear()
+            self.screenshot_labels[index].setText("Загрузка...")
+    
+    def release_screenshots(self):
+        if self.screenshot_loader is not None:
+            self.screenshot_loader.cancel_all()
+            self.screenshot_loader = None
+        self.screenshot_pixmaps.clear()
+        for label in self.screenshot_labels:
+            label.clear()
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_visible_screenshots()
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_visible_screenshots()
+    
+    def done(self, result):
+        self.release_screenshots()
+        super().done(result)
+    
+    def on_icon_ready(self, key, pixmap):
+        self.icon_label.setPixmap(pixmap)
+    
+    def on_icon_failed(self, key, error_msg):
+        self.icon_label.setText("❌\nИконка")
+    
+    def show_size(self, size):
+        size_str = format_file_size(size) if size else "Неизвестно"
+        self.size_label.setText(f"Размер: {size_str}")
+    
+    def on_size_checked(self, url, size):
+        if url == self.app_data.get('download_url'):
+            self.show_size(size)
+    
+    def on_size_check_failed(self, url, error_msg):
+        if url == self.app_data.get('download_url'):
+            self.size_label.setText("Размер: неизвестно")
+    
+    def on_screenshot_ready(self, index, pixmap):
+        if self.screenshot_loader is None:
+            return
+        self.screenshot_pixmaps[index] = pixmap
+        self.screenshot_labels[index].setPixmap(pixmap)
+        if self.screenshot_memory() > self.SCREENSHOT_MEMORY_BUDGET:
+            self.trim_screenshots()
+    
+    def on_screenshot_failed(self, index, error_msg):
+        if self.screenshot_loader is None:
+            return
+        self.screenshot_labels[index].hide()
+        NetworkTracer.shared().failure(self.screenshot_urls[index], f"Ошибка загрузки скриншота: {error_msg}")
+        self.schedule_visible_screenshots()
+    
+    def start_download(self):
+        if self.app_data.get('download_url'):
+            self.parent().enqueue_download(self.app_data)
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Ошибка", "Ссылка для скачивания недоступна")
+
+class DownloadProgressDialog(QDialog):
+    def __init__(self, job, manager, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.manager = manager
+        self.setAttribute(Qt.WA_DeleteOnClose)
+        self.init_ui()
+        self.job.changed.connect(self.update_progress)
+        self.update_progress()
+
+    def init_ui(self):
+        self.setWindowTitle("Скачивание")
+        self.setFixedSize(450, 250)
+
+        layout = QVBoxLayout()
+
+        title_label = QLabel(f"Скачивание: {self.job.name}")
+        title_label.setFont(QFont("Arial", 14, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setStyleSheet("""
+            QProgressBar {
+                border: 2px solid #555;
+                border-radius: 5px;
+                text-align: center;
+                height: 20px;
+                color: white;
+            }
+            QProgressBar::chunk {
+                background-color: #28a745;
+                width: 20px;
+            }
+        """)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Получение данных...")
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setWordWrap(True)
+        self.status_label.setStyleSheet("font-size: 11px; color: #ccc;")
+        layout.addWidget(self.status_label)
+
+        self.details_label = QLabel()
+        self.details_label.setAlignment(Qt.AlignCenter)
+        self.details_label.setStyleSheet("font-size: 11px; color: #aaa;")
+        layout.addWidget(self.details_label)
+
+        self.path_label = QLabel(self.job.save_path)
+        self.path_label.setAlignment(Qt.AlignCenter)
+        self.path_label.setStyleSheet("font-size: 10px; color: #888;")
+        layout.addWidget(self.path_label)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        close_btn = QPushButton("Скрыть")
+        close_btn.clicked.connect(self.close)
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+
+        self.setLayout(layout)
+
+    def update_progress(self):
+        job = self.job
+        self.progress_bar.setValue(job.progress)
+        if job.status == DownloadJob.DONE:
+            self.status_label.setText("Готово!")
+        elif job.status == DownloadJob.RUNNING:
+            self.status_label.setText(f"{DownloadJob.STATUS_TEXT[job.status]}: {job.progress}%")
+        else:
+            self.status_label.setText(job.status_text())
+
+        lines = []
+        if job.total > 0:
+            lines.append(f"Загружено: {format_file_size(job.downloaded)} из {format_file_size(job.total)}")
+        elif job.downloaded > 0:
+            lines.append(f"Загружено: {format_file_size(job.downloaded)}")
+        if job.status == DownloadJob.RUNNING:
+            lines.append(f"Скорость: {format_file_size(job.average_speed)}/с (сейчас {format_file_size(job.speed)}/с)")
+            if job.eta is not None:
+                lines.append(f"Осталось: {format_duration(job.eta)}")
+        self.details_label.setText("\n".join(lines))
+
+class NetworkDebugWindow(QDialog):
+    COLUMNS = (
+        ('id', "#"),
+        ('started_at', "Время"),
+        ('method', "Метод"),
+        ('status', "Статус"),
+        ('url', "URL"),
+        ('kind', "Тип"),
+        ('cache', "Кэш"),
+        ('thread', "Поток"),
+        ('initiator', "Источник"),
+        ('bytes', "Байт"),
+        ('dns', "DNS"),
+        ('connect', "Соед."),
+        ('tls', "TLS"),
+        ('wait', "Ожид."),
+        ('receive', "Приём"),
+        ('total', "Всего, мс"),
+        ('error', "Ошибка"),
+    )
+    TIMING_COLUMNS = ('dns', 'connect', 'tls', 'wait', 'receive', 'total')
+    REFRESH_INTERVAL = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.tracer = NetworkTracer.shared()
+        self.revision = None
+        self.entries = []
+        self.columns_sized = False
+        self.init_ui()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_INTERVAL)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.refresh_timer.start()
+        self.refresh()
+
+    def init_ui(self):
+        self.setWindowTitle("Сетевые запросы")
+        self.resize(1100, 600)
+
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("Фильтр по URL, потоку или ошибке")
+        self.filter_edit.textChanged.connect(self.force_refresh)
+        controls.addWidget(self.filter_edit)
+
+        self.errors_only = QCheckBox("Только ошибки")
+        self.errors_only.toggled.connect(self.force_refresh)
+        controls.addWidget(self.errors_only)
+
+        self.pause_check = QCheckBox("Пауза")
+        controls.addWidget(self.pause_check)
+
+        clear_btn = QPushButton("Очистить")
+        clear_btn.clicked.connect(self.clear)
+        controls.addWidget(clear_btn)
+
+        json_btn = QPushButton("Экспорт JSON")
+        json_btn.clicked.connect(lambda: self.export("json"))
+        controls.addWidget(json_btn)
+
+        har_btn = QPushButton("Экспорт HAR")
+        har_btn.clicked.connect(lambda: self.export("har"))
+        controls.addWidget(har_btn)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for key, title in self.COLUMNS])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.verticalHeader().hide()
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.itemSelectionChanged.connect(self.show_details)
+        layout.addWidget(self.table, 3)
+
+        self.details = QTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setFont(QFont("Monospace", 9))
+        layout.addWidget(self.details, 1)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.setLayout(layout)
+
+    def force_refresh(self):
+        self.revision = None
+        self.refresh()
+
+    def refresh(self):
+        if self.pause_check.isChecked() or not self.isVisible() and self.revision is not None:
+            return
+        revision, entries = self.tracer.snapshot()
+        if revision == self.revision:
+            return
+        self.revision = revision
+
+        text = self.filter_edit.text().casefold()
+        selected = self.selected_entry()
+        selected_id = selected['id'] if selected else None
+        self.entries = [entry for entry in reversed(entries) if self.matches(entry, text)]
+
+        self.table.setUpdatesEnabled(False)
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            for column, (key, title) in enumerate(self.COLUMNS):
+                item = QTableWidgetItem(self.cell_text(entry, key))
+                if key in self.TIMING_COLUMNS or key in ('id', 'bytes', 'status'):
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                if entry['state'] == 'failed' or (entry['status'] or 0) >= 400:
+                    item.setForeground(QColor("#c0392b"))
+                elif entry['state'] == 'pending':
+                    item.setForeground(QColor("#7f8c8d"))
+                self.table.setItem(row, column, item)
+            if entry['id'] == selected_id:
+                self.table.selectRow(row)
+        if self.entries and not self.columns_sized:
+            self.table.resizeColumnsToContents()
+            self.table.setColumnWidth(4, 320)
+            self.columns_sized = True
+        self.table.setUpdatesEnabled(True)
+        self.update_summary(entries)
+
+    def matches(self, entry, text):
+        if self.errors_only.isChecked() and entry['state'] != 'failed' and (entry['status'] or 0) < 400:
+            return False
+        if not text:
+            return True
+        return any(text in str(entry[key] or '').casefold() for key in ('url', 'thread', 'initiator', 'error'))
+
+    def cell_text(self, entry, key):
+        if key in self.TIMING_COLUMNS:
+            value = entry['timings'][key]
+            return f"{value:.1f}" if value is not None else ""
+        value = entry[key]
+        if value is None:
+            return "…" if key == 'status' and entry['state'] == 'pending' else ""
+        if key == 'started_at':
+            return time.strftime('%H:%M:%S', time.localtime(value)) + f".{int(value % 1 * 1000):03d}"
+        if key == 'bytes':
+            return format_file_size(value) if value else ""
+        return str(value)
+
+    def update_summary(self, entries):
+        requests_made = [entry for entry in entries if entry['method'] and entry['cache'] != 'hit']
+        failed = sum(1 for entry in entries if entry['state'] == 'failed')
+        hits = sum(1 for entry in entries if entry['cache'] == 'hit')
+        received = sum(entry['bytes'] for entry in requests_made)
+        waits = [entry['timings']['wait'] for entry in requests_made if entry['timings']['wait'] is not None]
+        summary = (f"Запросов: {len(requests_made)} · ошибок: {failed} · из кэша: {hits} · "
+                   f"получено: {format_file_size(received)}")
+        if waits:
+            summary += f" · среднее ожидание ответа: {sum(waits) / len(waits):.0f} мс"
+        self.summary_label.setText(summary)
+
+    def selected_entry(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows or rows[0].row() >= len(self.entries):
+            return None
+        return self.entries[rows[0].row()]
+
+    def show_details(self):
+        entry = self.selected_entry()
+        self.details.setPlainText(json.dumps(entry, ensure_ascii=False, indent=2) if entry else "")
+
+    def clear(self):
+        self.tracer.clear()
+        self.details.clear()
+        self.force_refresh()
+
+    def export(self, kind):
+        default_name = f"pidorlauncher-network-{time.strftime('%Y%m%d-%H%M%S')}.{kind}"
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Экспорт запросов", default_name,
+                                                            "HAR (*.har)" if kind == "har" else "JSON (*.json)")
+        if not path:
+            return
+        data = self.tracer.export_har() if kind == "har" else self.tracer.export_json()
+        try:
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+        except OSError as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось сохранить файл: {e}")
@@ -0,0 +1,1730 @@
+import sys
+import os
+import json
+import threading
+import heapq
+import time
+from collections import Counter
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
+                             QHBoxLayout, QListView, QLabel, QPushButton, QLineEdit, 
+                             QProgressBar, QMessageBox, QScrollArea, QSplashScreen,
+                             QFrame, QComboBox, QStyle, QStyledItemDelegate,
+                             QToolBar, QAction, QStatusBar, QDockWidget, QSpinBox, QShortcut)
+from PyQt5.QtCore import (Qt, QThread, QObject, QRunnable, QThreadPool, pyqtSignal,
+                          QTimer, QSize, QSettings, QBuffer, QByteArray, QIODevice,
+                          QAbstractListModel, QModelIndex, QRect)
+from PyQt5.QtGui import (QPixmap, QFont, QPalette, QColor, QImage, QImageReader, QPixmapCache,
+                         QPainter, QPen, QKeySequence)
+import urllib.parse
+from core import (APP_VERSION, CATALOG_URL, HttpClient, BandwidthScheduler, MediaCache, SizeCache, SearchIndex,
+                  CatalogLoader, Downloader, DownloadStopped, NetworkTracer, version_key, install_dir,
+                  staged_update_version, format_file_size, format_duration, download_path_for)
+
+class UpdateChecker(QThread):
+    update_available = pyqtSignal(dict)
+    no_update = pyqtSignal()
+    check_failed = pyqtSignal(str)
+
+    def __init__(self, update_url):
+        super().__init__()
+        self.update_url = update_url
+
+    def run(self):
+        try:
+            response = HttpClient.shared().get(self.update_url)
+            response.raise_for_status()
+            update_data = response.json()
+            
+            new_version = update_data.get('version')
+            
+            if version_key(new_version) > version_key(APP_VERSION) and new_version != staged_update_version():
+                self.update_available.emit(update_data)
+            else:
+                self.no_update.emit()
+                
+        except Exception as e:
+            self.check_failed.emit(str(e))
+
+class DataLoader(QThread):
+    data_loaded = pyqtSignal(list)
+    cache_loaded = pyqtSignal(list)
+    rows_parsed = pyqtSignal(list)
+    changes_loaded = pyqtSignal(object)
+    revision_loaded = pyqtSignal(object)
+    not_modified = pyqtSignal()
+    index_ready = pyqtSignal(int)
+    load_failed = pyqtSignal(str)
+    progress_updated = pyqtSignal(int, str)
+
+    def __init__(self, data_url, show_cached=True, stream_rows=True, cache=None, search_index=None,
+                 base=None, revision=None):
+        super().__init__()
+        self.data_url = data_url
+        self.show_cached = show_cached
+        self.stream_rows = stream_rows
+        self.search_index = search_index
+        self.base = base
+        self.revision = revision
+        self.loader = CatalogLoader(data_url, cache, on_rows=self.on_rows, on_progress=self.progress_updated.emit)
+
+    def run(self):
+        try:
+            cache = self.loader.cache
+            meta = cache.load_meta(self.data_url)
+            if meta is not None and self.show_cached and self.base is None:
+                cached_data = cache.load_programs()
+                if cached_data:
+                    self.cache_loaded.emit(cached_data)
+                    self.revision_loaded.emit(meta.get('revision'))
+                    self.update_index(cached_data)
+                    self.stream_rows = False
+                    self.base, self.revision = cached_data, meta.get('revision')
+                else:
+                    meta = None
+
+            if self.base is not None:
+                changes = self.loader.fetch_changes(self.base, self.revision, meta)
+                if changes is None:
+                    self.not_modified.emit()
+                    return
+                if not changes:
+                    self.revision_loaded.emit(changes.revision)
+                    self.loader.save(changes.programs)
+                    self.not_modified.emit()
+                    return
+                self.changes_loaded.emit(changes)
+                self.revision_loaded.emit(changes.revision)
+                self.update_index(changes.programs)
+                self.loader.save(changes.programs)
+                return
+
+            programs_data = self.loader.fetch(meta)
+            if programs_data is None:
+                self.not_modified.emit()
+                return
+
+            self.data_loaded.emit(programs_data)
+            self.revision_loaded.emit(self.loader.revision)
+            self.update_index(programs_data)
+            self.loader.save(programs_data)
+            
+        except Exception as e:
+            self.load_failed.emit(str(e))
+
+    def update_index(self, programs_data):
+        if self.search_index is not None:
+            self.index_ready.emit(self.search_index.update(programs_data))
+
+    def on_rows(self, batch):
+        if self.stream_rows:
+            self.rows_parsed.emit(batch)
+
+class SearchWorker(QThread):
+    results_ready = pyqtSignal(int, int, object)
+
+    def __init__(self, search_index, parent=None):
+        super().__init__(parent)
+        self.search_index = search_index
+        self.condition = threading.Condition()
+        self.pending = None
+        self.stopped = False
+
+    def request(self, request_id, query, facets):
+        with self.condition:
+            self.pending = (request_id, query, facets)
+            self.condition.notify()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.wait()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                request_id, query, facets = self.pending
+                self.pending = None
+            generation, rows = self.search_index.search(query, **facets)
+            self.results_ready.emit(request_id, generation, rows)
+
+class SizeServiceSignals(QObject):
+    size_checked = pyqtSignal(str, object)
+    check_failed = pyqtSignal(str, str)
+
+class SizeCheckWorker(QRunnable):
+    def __init__(self, service):
+        super().__init__()
+        self.service = service
+
+    def run(self):
+        while True:
+            url = self.service.take_job()
+            if url is None:
+                return
+            try:
+                size = self.check_size(url)
+            except Exception as e:
+                self.emit_result('check_failed', url, str(e))
+                continue
+            self.emit_result('size_checked', url, size)
+
+    def emit_result(self, signal_name, *args):
+        try:
+            getattr(self.service.signals, signal_name).emit(*args)
+        except RuntimeError:
+            pass
+
+    def check_size(self, url):
+        cache = self.service.cache
+        entry = cache.lookup(url)
+        headers = cache.conditional_headers(entry) if entry is not None else {}
+        response = HttpClient.shared().head(url, headers=headers)
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated(url, response.headers)
+            return entry['size']
+
+        response.raise_for_status()
+        size = int(response.headers.get('content-length', 0)) or None
+        cache.store(url, size, response.headers)
+        return size
+
+class SizeService(QObject):
+    size_ready = pyqtSignal(str, object)
+    size_failed = pyqtSignal(str, str)
+
+    MAX_CONCURRENT = 4
+    PRIORITY_VISIBLE = 2
+    PRIORITY_BACKGROUND = 0
+
+    _shared = None
+
+    def __init__(self, cache=None, max_workers=MAX_CONCURRENT, parent=None):
+        super().__init__(parent)
+        self.cache = cache or SizeCache()
+        self.sizes = self.cache.sizes()
+        self.max_workers = max_workers
+        self.queue = []
+        self.queued = {}
+        self.started = set()
+        self.sequence = 0
+        self.active_workers = 0
+        self.lock = threading.Lock()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+        self.signals = SizeServiceSignals()
+        self.signals.size_checked.connect(self.on_size_checked)
+        self.signals.check_failed.connect(self.on_check_failed)
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def has_size(self, url):
+        return url in self.sizes
+
+    def size_for(self, url):
+        return self.sizes.get(url)
+
+    def prefetch(self, programs_data):
+        urls = []
+        for app in programs_data:
+            url = app.get('download_url')
+            if not url:
+                continue
+            if isinstance(app.get('size'), int) and app['size'] > 0:
+                self.sizes[url] = app['size']
+            else:
+                urls.append(url)
+        self.cache.prune(set(urls))
+        for url in urls:
+            entry = self.cache.lookup(url)
+            if entry is None or not self.cache.is_fresh(entry):
+                self.request(url, self.PRIORITY_BACKGROUND)
+
+    def request(self, url, priority=PRIORITY_BACKGROUND):
+        with self.lock:
+            if url in self.started or self.queued.get(url, priority - 1) >= priority:
+                return
+            self.queued[url] = priority
+            self.sequence += 1
+            heapq.heappush(self.queue, (-priority, self.sequence, url))
+
+            if self.active_workers >= self.max_workers:
+                return
+            self.active_workers += 1
+
+        self.pool.start(SizeCheckWorker(self))
+
+    def take_job(self):
+        with self.lock:
+            while self.queue:
+                priority, _, url = heapq.heappop(self.queue)
+                if self.queued.get(url) != -priority:
+                    continue
+                del self.queued[url]
+                self.started.add(url)
+                return url
+
+            self.active_workers -= 1
+            return None
+
+    def shutdown(self):
+        with self.lock:
+            self.queue.clear()
+            self.queued.clear()
+        self.cache.save(force=True)
+
+    def on_size_checked(self, url, size):
+        with self.lock:
+            self.started.discard(url)
+        self.sizes[url] = size
+        self.cache.save()
+        self.size_ready.emit(url, size)
+
+    def on_check_failed(self, url, error_msg):
+        with self.lock:
+            self.started.discard(url)
+        self.size_failed.emit(url, error_msg)
+
+class DownloadThread(QThread):
+    progress_updated = pyqtSignal(dict)
+    download_finished = pyqtSignal(str)
+    download_error = pyqtSignal(str)
+    download_stopped = pyqtSignal()
+
+    def __init__(self, url, save_path, segments=Downloader.SEGMENTS, expected_sha256=None, expected_size=None,
+                 mirrors=None):
+        super().__init__()
+        self.downloader = Downloader(url, save_path, segments, expected_sha256, expected_size, mirrors,
+                                     on_progress=self.progress_updated.emit)
+
+    def stop(self, discard=False):
+        self.downloader.stop(discard)
+
+    def is_stopping(self):
+        return self.downloader.stop_event.is_set()
+
+    def run(self):
+        try:
+            self.download_finished.emit(self.downloader.run())
+        except DownloadStopped:
+            self.download_stopped.emit()
+        except Exception as e:
+            self.download_error.emit(str(e))
+
+class IconLoaderSignals(QObject):
+    image_ready = pyqtSignal(int, object, QImage, str)
+    image_failed = pyqtSignal(int, object, str)
+
+class IconLoaderWorker(QRunnable):
+    def __init__(self, loader):
+        super().__init__()
+        self.loader = loader
+
+    def run(self):
+        while True:
+            job = self.loader.take_job()
+            if job is None:
+                return
+            generation, key, url = job
+            try:
+                image = self.load_image(url)
+            except Exception as e:
+                self.emit_result('image_failed', generation, key, str(e))
+                continue
+            if generation == self.loader.generation:
+                self.emit_result('image_ready', generation, key, image, url)
+
+    def emit_result(self, signal_name, *args):
+        try:
+            getattr(self.loader.signals, signal_name).emit(*args)
+        except RuntimeError:
+            pass
+
+    def load_image(self, url):
+        cache = self.loader.cache
+        variant = self.loader.variant
+        entry = cache.lookup(url)
+
+        if entry is not None and cache.is_fresh(entry):
+            image = self.cached_image(entry['hash'])
+            if image is not None:
+                NetworkTracer.shared().record_cache_hit(url, 'media')
+                return image
+
+        headers = cache.conditional_headers(entry) if entry is not None else {}
+        response = HttpClient.shared().get(url, 'media', headers=headers, stream=True)
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            cache.revalidated(url, response.headers)
+            image = self.cached_image(entry['hash'])
+            if image is not None:
+                return image
+            response = HttpClient.shared().get(url, 'media', stream=True)
+
+        with response:
+            response.raise_for_status()
+            data = BandwidthScheduler.shared().read(response, self.loader.bandwidth_priority)
+        content_hash = cache.store(url, data, response.headers)
+        image = self.scaled_image(data)
+        cache.store_variant(content_hash, variant, self.encode_image(image))
+        return image
+
+    def cached_image(self, content_hash):
+        cache = self.loader.cache
+        data = cache.read_variant(content_hash, self.loader.variant)
+        if data is not None:
+            image = QImage()
+            if image.loadFromData(data):
+                return image
+
+        data = cache.read_original(content_hash)
+        if data is None:
+            return None
+        image = self.scaled_image(data)
+        cache.store_variant(content_hash, self.loader.variant, self.encode_image(image))
+        return image
+
+    def scaled_image(self, data):
+        buffer = QBuffer()
+        buffer.setData(QByteArray(data))
+        buffer.open(QIODevice.ReadOnly)
+        reader = QImageReader(buffer)
+        reader.setAutoTransform(True)
+        width, height = MediaCache.VARIANTS[self.loader.variant]
+        size = reader.size()
+        if size.isValid():
+            reader.setScaledSize(size.scaled(width, height, Qt.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
+            raise ValueError(f"Не удалось декодировать изображение: {reader.errorString()}")
+        if not size.isValid() and (image.width() > width or image.height() > height):
+            image = image.scaled(width, height, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        return image
+
+    def encode_image(self, image):
+        data = QByteArray()
+        buffer = QBuffer(data)
+        buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "PNG")
+        return bytes(data)
+
+class IconLoader(QObject):
+    icon_ready = pyqtSignal(object, QPixmap)
+    icon_failed = pyqtSignal(object, str)
+
+    PRIORITY_VISIBLE = 2
+    PRIORITY_BACKGROUND = 0
+
+    def __init__(self, variant='icon48', max_workers=6, cache=None, parent=None, use_pixmap_cache=True,
+                 bandwidth_priority=BandwidthScheduler.PRIORITY_BACKGROUND):
+        super().__init__(parent)
+        self.variant = variant
+        self.bandwidth_priority = bandwidth_priority
+        self.use_pixmap_cache = use_pixmap_cache
+        self.cache = cache or MediaCache.shared()
+        self.max_workers = max_workers
+        self.generation = 0
+        self.queue = []
+        self.queued = {}
+        self.started = set()
+        self.sequence = 0
+        self.active_workers = 0
+        self.lock = threading.Lock()
+
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.cancel_all)
+
+        self.signals = IconLoaderSignals()
+        self.signals.image_ready.connect(self.on_image_ready)
+        self.signals.image_failed.connect(self.on_image_failed)
+
+    def pixmap_cache_key(self, url):
+        return f"{self.variant}:{url}"
+
+    def request(self, key, url, priority=PRIORITY_BACKGROUND):
+        if self.use_pixmap_cache:
+            pixmap = QPixmapCache.find(self.pixmap_cache_key(url))
+            if pixmap is not None:
+                self.icon_ready.emit(key, pixmap)
+                return
+
+        with self.lock:
+            if key in self.started or self.queued.get(key, priority - 1) >= priority:
+                return
+            self.queued[key] = priority
+            self.sequence += 1
+            heapq.heappush(self.queue, (-priority, self.sequence, key, url))
+
+            if self.active_workers >= self.max_workers:
+                return
+            self.active_workers += 1
+
+        self.pool.start(IconLoaderWorker(self))
+
+    def take_job(self):
+        with self.lock:
+            while self.queue:
+                priority, _, key, url = heapq.heappop(self.queue)
+                if self.queued.get(key) != -priority:
+                    continue
+                del self.queued[key]
+                self.started.add(key)
+                return self.generation, key, url
+
+            self.active_workers -= 1
+            return None
+
+    def forget(self, key):
+        with self.lock:
+            self.started.discard(key)
+
+    def cancel_all(self):
+        with self.lock:
+            self.generation += 1
+            self.queue.clear()
+            self.queued.clear()
+            self.started.clear()
+
+    def on_image_ready(self, generation, key, image, url):
+        if generation == self.generation:
+            pixmap = QPixmap.fromImage(image)
+            if self.use_pixmap_cache:
+                QPixmapCache.insert(self.pixmap_cache_key(url), pixmap)
+            self.icon_ready.emit(key, pixmap)
+
+    def on_image_failed(self, generation, key, error_msg):
+        if generation == self.generation:
+            self.icon_failed.emit(key, error_msg)
+
+class ThemeManager:
+    @staticmethod
+    def apply_light_theme(app):
+        app.setStyle('Fusion')
+        palette = QPalette()
+        palette.setColor(QPalette.Window, QColor(240, 240, 240))
+        palette.setColor(QPalette.WindowText, Qt.black)
+        palette.setColor(QPalette.Base, QColor(255, 255, 255))
+        palette.setColor(QPalette.AlternateBase, QColor(233, 231, 227))
+        palette.setColor(QPalette.ToolTipBase, Qt.white)
+        palette.setColor(QPalette.ToolTipText, Qt.black)
+        palette.setColor(QPalette.Text, Qt.black)
+        palette.setColor(QPalette.Button, QColor(240, 240, 240))
+        palette.setColor(QPalette.ButtonText, Qt.black)
+        palette.setColor(QPalette.BrightText, Qt.red)
+        palette.setColor(QPalette.Link, QColor(42, 130, 218))
+        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+        palette.setColor(QPalette.HighlightedText, Qt.white)
+        app.setPalette(palette)
+
+    @staticmethod
+    def apply_dark_theme(app):
+        app.setStyle('Fusion')
+        palette = QPalette()
+        palette.setColor(QPalette.Window, QColor(45, 45, 45))
+        palette.setColor(QPalette.WindowText, Qt.white)
+        palette.setColor(QPalette.Base, QColor(25, 25, 25))
+        palette.setColor(QPalette.AlternateBase, QColor(45, 45, 45))
+        palette.setColor(QPalette.ToolTipBase, QColor(60, 60, 60))
+        palette.setColor(QPalette.ToolTipText, Qt.white)
+        palette.setColor(QPalette.Text, Qt.white)
+        palette.setColor(QPalette.Button, QColor(65, 65, 65))
+        palette.setColor(QPalette.ButtonText, Qt.white)
+        palette.setColor(QPalette.BrightText, Qt.red)
+        palette.setColor(QPalette.Link, QColor(42, 130, 218))
+        palette.setColor(QPalette.Highlight, QColor(42, 130, 218))
+        palette.setColor(QPalette.HighlightedText, Qt.white)
+        app.setPalette(palette)
+
+class DownloadJob(QObject):
+    changed = pyqtSignal()
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    PAUSED = "paused"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    STATUS_TEXT = {
+        QUEUED: "В очереди",
+        RUNNING: "Скачивание",
+        PAUSED: "Пауза",
+        DONE: "Готово",
+        FAILED: "Ошибка",
+        CANCELLED: "Отменено",
+    }
+
+    def __init__(self, app_data, save_path, parent=None):
+        super().__init__(parent)
+        self.app_data = app_data
+        self.url = app_data.get('download_url', '')
+        self.host = urllib.parse.urlparse(self.url).hostname or ''
+        self.save_path = save_path
+        self.status = self.QUEUED
+        self.stop_status = self.PAUSED
+        self.progress = 0
+        self.downloaded = 0
+        self.total = 0
+        self.speed = 0
+        self.average_speed = 0
+        self.eta = None
+        self.error = ''
+        self.thread = None
+
+    @property
+    def name(self):
+        return self.app_data['name']
+
+    def status_text(self):
+        text = self.STATUS_TEXT.get(self.status, self.status)
+        if self.status == self.RUNNING:
+            text += f": {self.progress}%"
+            if self.average_speed > 0:
+                text += f" · {format_file_size(self.average_speed)}/с"
+            if self.eta is not None:
+                text += f" · осталось {format_duration(self.eta)}"
+        elif self.status == self.FAILED and self.error:
+            text += f": {self.error}"
+        return text
+
+    def set_status(self, status, error=''):
+        self.status = status
+        self.error = error
+        self.changed.emit()
+
+    def set_progress(self, payload):
+        if payload['progress'] >= 0:
+            self.progress = payload['progress']
+        self.downloaded = payload['downloaded']
+        self.total = payload['total']
+        self.speed = payload['speed']
+        self.average_speed = payload['average_speed']
+        self.eta = payload['eta']
+        self.changed.emit()
+
+class DownloadManager(QObject):
+    job_added = pyqtSignal(object)
+    job_removed = pyqtSignal(object)
+    job_finished = pyqtSignal(object)
+
+    DEFAULT_MAX_CONCURRENT = 3
+    DEFAULT_MAX_PER_HOST = 2
+
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self.settings = settings
+        self.jobs = []
+        self.max_concurrent = settings.value("downloads/max_concurrent", self.DEFAULT_MAX_CONCURRENT, type=int)
+        self.max_per_host = settings.value("downloads/max_per_host", self.DEFAULT_MAX_PER_HOST, type=int)
+
+    def set_limits(self, max_concurrent, max_per_host):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_per_host = max(1, max_per_host)
+        self.settings.setValue("downloads/max_concurrent", self.max_concurrent)
+        self.settings.setValue("downloads/max_per_host", self.max_per_host)
+        self.schedule()
+
+    def enqueue(self, app_data):
+        url = app_data.get('download_url', '')
+        for job in list(self.jobs):
+            if job.url != url:
+                continue
+            if job.status != DownloadJob.DONE:
+                self.resume(job)
+                return job
+            self.remove(job)
+
+        save_path = download_path_for(app_data, taken=[job.save_path for job in self.jobs])
+        job = DownloadJob(app_data, save_path, self)
+        self.jobs.append(job)
+        self.job_added.emit(job)
+        self.schedule()
+        return job
+
+    def schedule(self):
+        running = [job for job in self.jobs if job.thread is not None]
+        per_host = Counter(job.host for job in running)
+
+        for job in self.jobs:
+            if len(running) >= self.max_concurrent:
+                break
+            if job.status != DownloadJob.QUEUED or job.thread is not None:
+                continue
+            if per_host[job.host] >= self.max_per_host:
+                continue
+            self.start_job(job)
+            running.append(job)
+            per_host[job.host] += 1
+
+    def start_job(self, job):
+        thread = DownloadThread(job.url, job.save_path, expected_sha256=job.app_data.get('sha256'),
+                                expected_size=job.app_data.get('size'), mirrors=job.app_data.get('mirrors'))
+        thread.progress_updated.connect(job.set_progress)
+        thread.download_finished.connect(lambda path, job=job: self.on_job_finished(job))
+        thread.download_error.connect(lambda error_msg, job=job: job.set_status(DownloadJob.FAILED, error_msg))
+        thread.download_stopped.connect(lambda job=job: job.set_status(job.stop_status))
+        thread.finished.connect(lambda job=job, thread=thread: self.on_thread_finished(job, thread))
+        job.thread = thread
+        job.stop_status = DownloadJob.PAUSED
+        job.set_status(DownloadJob.RUNNING)
+        thread.start()
+
+    def on_job_finished(self, job):
+        job.progress = 100
+        job.set_status(DownloadJob.DONE)
+        self.job_finished.emit(job)
+
+    def on_thread_finished(self, job, thread):
+        if job.thread is thread:
+            job.thread = None
+        thread.deleteLater()
+        self.schedule()
+
+    def pause(self, job):
+        if job.thread is not None:
+            job.stop_status = DownloadJob.PAUSED
+            job.thread.stop()
+        elif job.status == DownloadJob.QUEUED:
+            job.set_status(DownloadJob.PAUSED)
+
+    def resume(self, job):
+        if job.status in (DownloadJob.PAUSED, DownloadJob.FAILED, DownloadJob.CANCELLED):
+            job.set_status(DownloadJob.QUEUED)
+            self.schedule()
+
+    def cancel(self, job):
+        if job.thread is not None:
+            job.stop_status = DownloadJob.CANCELLED
+            job.thread.stop(discard=True)
+        elif job.status != DownloadJob.DONE:
+            for path in Downloader.partial_paths(job.save_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            job.set_status(DownloadJob.CANCELLED)
+
+    def remove(self, job):
+        if job.thread is None and job.status != DownloadJob.QUEUED:
+            self.jobs.remove(job)
+            self.job_removed.emit(job)
+            job.deleteLater()
+
+    def clear_finished(self):
+        for job in list(self.jobs):
+            if job.status in (DownloadJob.DONE, DownloadJob.CANCELLED):
+                self.remove(job)
+
+    def has_active_jobs(self):
+        return any(job.thread is not None or job.status == DownloadJob.QUEUED for job in self.jobs)
+
+    def shutdown(self):
+        threads = [job.thread for job in self.jobs if job.thread is not None]
+        for thread in threads:
+            thread.stop()
+        for thread in threads:
+            thread.wait(5000)
+
+class DownloadJobWidget(QFrame):
+    details_requested = pyqtSignal(object)
+
+    def __init__(self, job, manager, parent=None):
+        super().__init__(parent)
+        self.job = job
+        self.manager = manager
+        self.init_ui()
+        self.job.changed.connect(self.refresh)
+        self.refresh()
+
+    def init_ui(self):
+        self.setFrameShape(QFrame.StyledPanel)
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(8, 6, 8, 6)
+
+        header_layout = QHBoxLayout()
+        self.name_label = QLabel(self.job.name)
+        self.name_label.setFont(QFont("Arial", 10, QFont.Bold))
+        header_layout.addWidget(self.name_label)
+        header_layout.addStretch()
+
+        self.pause_btn = QPushButton()
+        self.pause_btn.setFixedSize(90, 26)
+        self.pause_btn.clicked.connect(self.toggle_pause)
+        header_layout.addWidget(self.pause_btn)
+
+        self.cancel_btn = QPushButton("Отмена")
+        self.cancel_btn.setFixedSize(70, 26)
+        self.cancel_btn.clicked.connect(lambda: self.manager.cancel(self.job))
+        header_layout.addWidget(self.cancel_btn)
+
+        details_btn = QPushButton("…")
+        details_btn.setFixedSize(26, 26)
+        details_btn.setToolTip("Подробнее")
+        details_btn.clicked.connect(lambda: self.details_requested.emit(self.job))
+        header_layout.addWidget(details_btn)
+
+        layout.addLayout(header_layout)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setFixedHeight(14)
+        self.progress_bar.setTextVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("font-size: 11px; color: #7f8c8d;")
+        layout.addWidget(self.status_label)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        job = self.job
+        self.progress_bar.setValue(job.progress)
+        self.status_label.setText(job.status_text())
+
+        stopping = job.thread is not None and job.thread.is_stopping()
+        if job.status in (DownloadJob.QUEUED, DownloadJob.RUNNING):
+            self.pause_btn.setText("Пауза")
+        elif job.status in (DownloadJob.DONE, DownloadJob.CANCELLED):
+            self.pause_btn.setText("Удалить")
+        else:
+            self.pause_btn.setText("Продолжить")
+        self.pause_btn.setEnabled(not stopping)
+        self.cancel_btn.setEnabled(job.status not in (DownloadJob.DONE, DownloadJob.CANCELLED) and not stopping)
+
+    def toggle_pause(self):
+        job = self.job
+        if job.status in (DownloadJob.QUEUED, DownloadJob.RUNNING):
+            self.manager.pause(job)
+        elif job.status in (DownloadJob.DONE, DownloadJob.CANCELLED):
+            self.manager.remove(job)
+        else:
+            self.manager.resume(job)
+        self.refresh()
+
+class DownloadsPanel(QDockWidget):
+    def __init__(self, manager, parent=None):
+        super().__init__("Загрузки", parent)
+        self.manager = manager
+        self.job_widgets = {}
+        self.setObjectName("downloads_panel")
+        self.init_ui()
+
+        self.manager.job_added.connect(self.add_job)
+        self.manager.job_removed.connect(self.remove_job)
+        for job in self.manager.jobs:
+            self.add_job(job)
+
+    def init_ui(self):
+        container = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        limits_layout = QHBoxLayout()
+        limits_layout.addWidget(QLabel("Одновременно:"))
+        self.max_concurrent_spin = QSpinBox()
+        self.max_concurrent_spin.setRange(1, 10)
+        self.max_concurrent_spin.setValue(self.manager.max_concurrent)
+        self.max_concurrent_spin.valueChanged.connect(self.on_limits_changed)
+        limits_layout.addWidget(self.max_concurrent_spin)
+
+        limits_layout.addWidget(QLabel("На сервер:"))
+        self.max_per_host_spin = QSpinBox()
+        self.max_per_host_spin.setRange(1, 10)
+        self.max_per_host_spin.setValue(self.manager.max_per_host)
+        self.max_per_host_spin.valueChanged.connect(self.on_limits_changed)
+        limits_layout.addWidget(self.max_per_host_spin)
+        limits_layout.addStretch()
+        layout.addLayout(limits_layout)
+
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        jobs_widget = QWidget()
+        self.jobs_layout = QVBoxLayout()
+        self.jobs_layout.setSpacing(6)
+        self.jobs_layout.addStretch()
+        jobs_widget.setLayout(self.jobs_layout)
+        scroll_area.setWidget(jobs_widget)
+        layout.addWidget(scroll_area)
+
+        clear_btn = QPushButton("Очистить завершённые")
+        clear_btn.clicked.connect(self.manager.clear_finished)
+        layout.addWidget(clear_btn)
+
+        container.setLayout(layout)
+        container.setMinimumWidth(320)
+        self.setWidget(container)
+
+    def on_limits_changed(self):
+        self.manager.set_limits(self.max_concurrent_spin.value(), self.max_per_host_spin.value())
+
+    def add_job(self, job):
+        widget = DownloadJobWidget(job, self.manager)
+        widget.details_requested.connect(self.show_job_details)
+        self.jobs_layout.insertWidget(self.jobs_layout.count() - 1, widget)
+        self.job_widgets[job] = widget
+        self.show()
+
+    def remove_job(self, job):
+        widget = self.job_widgets.pop(job, None)
+        if widget is not None:
+            widget.deleteLater()
+
+    def show_job_details(self, job):
+        from dialogs import DownloadProgressDialog
+        dialog = DownloadProgressDialog(job, self.manager, self)
+        dialog.show()
+
+class CatalogModel(QAbstractListModel):
+    AppDataRole = Qt.UserRole
+    SubtitleRole = Qt.UserRole + 1
+    IconUrlRole = Qt.UserRole + 2
+
+    icon_requested = pyqtSignal(str)
+
+    UPDATE_INTERVAL = 50
+
+    def __init__(self, size_service=None, parent=None):
+        super().__init__(parent)
+        self.size_service = size_service
+        self.apps = []
+        self.rows = None
+        self.icons = {}
+        self.requested_icons = set()
+        self.pending_icon_requests = []
+
+        self.update_timer = QTimer(self)
+        self.update_timer.setSingleShot(True)
+        self.update_timer.setInterval(self.UPDATE_INTERVAL)
+        self.update_timer.timeout.connect(self.emit_rows_changed)
+
+        self.icon_request_timer = QTimer(self)
+        self.icon_request_timer.setSingleShot(True)
+        self.icon_request_timer.setInterval(0)
+        self.icon_request_timer.timeout.connect(self.flush_icon_requests)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        if self.rows is not None:
+            return len(self.rows)
+        return len(self.apps)
+
+    def total_count(self):
+        return len(self.apps)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.rowCount():
+            return None
+        app_data = self.app_at(index.row())
+
+        if role == Qt.DisplayRole:
+            return app_data['name']
+        if role == self.SubtitleRole:
+            text = f"Версия: {app_data.get('version', 'Не указана')}"
+            developer = app_data.get('developer')
+            if developer:
+                text += f" | {developer}"
+            if self.size_service is not None:
+                size = self.size_service.size_for(app_data.get('download_url'))
+                if size:
+                    text += f" | {format_file_size(size)}"
+            return text
+        if role == Qt.DecorationRole:
+            return self.icon_for(app_data.get('icon_url'))
+        if role == self.AppDataRole:
+            return app_data
+        if role == self.IconUrlRole:
+            return app_data.get('icon_url')
+        return None
+
+    def icon_for(self, icon_url):
+        if not icon_url:
+            return None
+        pixmap = self.icons.get(icon_url)
+        if pixmap is None and icon_url not in self.requested_icons:
+            self.requested_icons.add(icon_url)
+            self.pending_icon_requests.append(icon_url)
+            self.icon_request_timer.start()
+        return pixmap
+
+    def flush_icon_requests(self):
+        requests_to_send, self.pending_icon_requests = self.pending_icon_requests, []
+        for icon_url in requests_to_send:
+            self.icon_requested.emit(icon_url)
+
+    def app_at(self, row):
+        if self.rows is not None:
+            return self.apps[self.rows[row]]
+        return self.apps[row]
+
+    def set_filter(self, rows):
+        if rows is None and self.rows is None:
+            return
+        old = self.rows if self.rows is not None else range(len(self.apps))
+        new = rows if rows is not None else range(len(self.apps))
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]:
+            suffix += 1
+
+        if prefix + suffix < len(old):
+            self.beginRemoveRows(QModelIndex(), prefix, len(old) - suffix - 1)
+            self.rows = list(old[:prefix]) + list(old[len(old) - suffix:])
+            self.endRemoveRows()
+        if prefix + suffix < len(new):
+            self.beginInsertRows(QModelIndex(), prefix, len(new) - suffix - 1)
+            self.rows = rows if rows is not None else list(new)
+            self.endInsertRows()
+        self.rows = rows
+
+    def set_apps(self, apps):
+        self.beginResetModel()
+        self.apps = list(apps)
+        self.rows = None
+        urls = {app.get('icon_url') for app in self.apps}
+        self.icons = {url: pixmap for url, pixmap in self.icons.items() if url in urls}
+        self.requested_icons = set(self.icons)
+        self.pending_icon_requests = []
+        self.endResetModel()
+
+    def append_apps(self, apps):
+        if not apps:
+            return
+        if self.rows is not None:
+            self.apps.extend(apps)
+            return
+        first = len(self.apps)
+        self.beginInsertRows(QModelIndex(), first, first + len(apps) - 1)
+        self.apps.extend(apps)
+        self.endInsertRows()
+
+    def apply_changes(self, changes):
+        for index, app in changes.updated:
+            self.apps[index] = app
+            row = self.row_of(index)
+            if row is not None:
+                self.dataChanged.emit(self.index(row), self.index(row))
+
+        for index in reversed(changes.removed):
+            row = self.row_of(index)
+            if row is not None:
+                self.beginRemoveRows(QModelIndex(), row, row)
+            del self.apps[index]
+            if self.rows is not None:
+                self.rows = [app_row - (app_row > index) for app_row in self.rows if app_row != index]
+            if row is not None:
+                self.endRemoveRows()
+
+        self.append_apps(changes.added)
+
+    def row_of(self, index):
+        if self.rows is None:
+            return index
+        try:
+            return self.rows.index(index)
+        except ValueError:
+            return None
+
+    def clear(self):
+        self.set_apps([])
+
+    def set_icon(self, icon_url, pixmap):
+        self.icons[icon_url] = pixmap
+        self.schedule_rows_changed()
+
+    def schedule_rows_changed(self, *args):
+        if not self.update_timer.isActive():
+            self.update_timer.start()
+
+    def emit_rows_changed(self):
+        if self.rowCount() > 0:
+            self.dataChanged.emit(self.index(0), self.index(self.rowCount() - 1))
+
+class AppItemDelegate(QStyledItemDelegate):
+    ROW_HEIGHT = 72
+    ICON_SIZE = 48
+    MARGIN = 4
+    PADDING = 12
+
+    THEMES = {
+        'light': {
+            'background': QColor('#f8f9fa'),
+            'border': QColor('#dee2e6'),
+            'hover_background': QColor('#e9ecef'),
+            'hover_border': QColor('#adb5bd'),
+            'selected_background': QColor('#e3f2fd'),
+            'selected_border': QColor('#2196f3'),
+            'text': QColor('#212529'),
+            'subtitle': QColor('#6c757d'),
+        },
+        'dark': {
+            'background': QColor('#3d3d3d'),
+            'border': QColor('#555555'),
+            'hover_background': QColor('#4a4a4a'),
+            'hover_border': QColor('#666666'),
+            'selected_background': QColor('#4a4a4a'),
+            'selected_border': QColor('#2196f3'),
+            'text': QColor('#ffffff'),
+            'subtitle': QColor('#bbbbbb'),
+        },
+    }
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.colors = self.THEMES['light']
+        self.title_font = QFont("Arial", 11, QFont.Bold)
+        self.subtitle_font = QFont("Arial", 9)
+
+    def set_theme(self, theme):
+        self.colors = self.THEMES.get(theme, self.THEMES['light'])
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        colors = self.colors
+        rect = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+        if option.state & QStyle.State_Selected:
+            background, border = colors['selected_background'], colors['selected_border']
+        elif option.state & QStyle.State_MouseOver:
+            background, border = colors['hover_background'], colors['hover_border']
+        else:
+            background, border = colors['background'], colors['border']
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(border, 2 if option.state & QStyle.State_Selected else 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 6, 6)
+
+        icon_rect = QRect(rect.left() + self.PADDING, rect.top() + (rect.height() - self.ICON_SIZE) // 2,
+                          self.ICON_SIZE, self.ICON_SIZE)
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None:
+            target = QRect(0, 0, pixmap.width(), pixmap.height())
+            target.moveCenter(icon_rect.center())
+            painter.drawPixmap(target, pixmap)
+
+        text_left = icon_rect.right() + self.PADDING
+        text_rect = QRect(text_left, rect.top() + self.PADDING // 2,
+                          rect.right() - text_left - self.PADDING, rect.height() - self.PADDING)
+        title_rect = QRect(text_rect.left(), text_rect.top(), text_rect.width(), text_rect.height() // 2)
+        subtitle_rect = QRect(text_rect.left(), title_rect.bottom(), text_rect.width(), text_rect.height() // 2)
+
+        painter.setPen(colors['text'])
+        painter.setFont(self.title_font)
+        title = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignLeft | Qt.AlignBottom, title)
+
+        painter.setPen(colors['subtitle'])
+        painter.setFont(self.subtitle_font)
+        subtitle = painter.fontMetrics().elidedText(index.data(CatalogModel.SubtitleRole), Qt.ElideRight, subtitle_rect.width())
+        painter.drawText(subtitle_rect, Qt.AlignLeft | Qt.AlignTop, subtitle)
+        painter.restore()
+
+class StartupMetrics:
+    BUDGETS_MS = {
+        'imports': 600,
+        'window_constructed': 1200,
+        'first_paint': 1500,
+    }
+
+    def __init__(self, started=None):
+        self.started = started if started is not None else time.perf_counter()
+        self.marks = {}
+        self.verbose = bool(os.environ.get('PIDORLAUNCHER_METRICS'))
+        self.budgets = dict(self.BUDGETS_MS)
+        scale = os.environ.get('PIDORLAUNCHER_STARTUP_BUDGET_SCALE')
+        if scale:
+            self.budgets = {name: budget * float(scale) for name, budget in self.budgets.items()}
+        self.on_first_paint = None
+
+    def mark(self, name):
+        if name in self.marks:
+            return
+        self.marks[name] = (time.perf_counter() - self.started) * 1000
+        if self.verbose:
+            print(f"[startup] {name}: {self.marks[name]:.1f} ms", file=sys.stderr)
+        if name == 'first_paint' and self.on_first_paint is not None:
+            self.on_first_paint()
+
+    def over_budget(self):
+        return {name: self.marks[name] for name, budget in self.budgets.items()
+                if name in self.marks and self.marks[name] > budget}
+
+    def report(self):
+        return {
+            'version': APP_VERSION,
+            'marks': {name: round(value, 1) for name, value in self.marks.items()},
+            'budgets': {name: round(budget, 1) for name, budget in self.budgets.items()},
+            'over_budget': sorted(self.over_budget()),
+        }
+
+    def print_report(self):
+        print(json.dumps(self.report(), ensure_ascii=False, indent=2), flush=True)
+        for name, value in self.over_budget().items():
+            print(f"[startup] {name}: {value:.1f} ms, бюджет {self.budgets[name]:.0f} ms", file=sys.stderr)
+
+class SoftwareDownloaderApp(QMainWindow):
+    BANDWIDTH_LIMITS_KB = (0, 256, 512, 1024, 2048, 5120, 10240)
+
+    def __init__(self, metrics=None):
+        super().__init__()
+        self.metrics = metrics or StartupMetrics()
+        self.update_url = "https://zenusus.serv00.net/updates/version.json"
+        self.programs_data_url = CATALOG_URL
+        
+        self.streamed_rows = 0
+        self.catalog_revision = None
+        self.current_theme = "light"
+        self.settings = QSettings("GovNoCorp", "pidorlauncher")
+        self.download_manager = DownloadManager(self.settings, self)
+        self.download_manager.job_finished.connect(self.on_download_finished)
+        self.media_cache = MediaCache.shared()
+        media_max_mb = self.settings.value("cache/media_max_mb", MediaCache.DEFAULT_MAX_BYTES // (1024 * 1024), type=int)
+        self.media_cache.set_max_bytes(media_max_mb * 1024 * 1024)
+        self.bandwidth_limit_kb = self.settings.value("network/bandwidth_limit_kb", 0, type=int)
+        BandwidthScheduler.shared().set_limit(self.bandwidth_limit_kb * 1024)
+        self.icon_loader = IconLoader('icon48', parent=self)
+        self.icon_loader.icon_ready.connect(self.on_icon_ready)
+        self.icon_loader.icon_failed.connect(self.on_icon_failed)
+        self.size_service = SizeService.shared()
+        self.apps_model = CatalogModel(self.size_service, self)
+        self.size_service.size_ready.connect(self.apps_model.schedule_rows_changed)
+        self.apps_model.icon_requested.connect(self.on_icon_requested)
+        self.apps_delegate = AppItemDelegate(self)
+        self.search_index = SearchIndex()
+        self.search_generation = -1
+        self.search_request = 0
+        self.search_worker = SearchWorker(self.search_index, self)
+        self.search_worker.results_ready.connect(self.on_search_results)
+        self.search_worker.start()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(0)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.init_ui()
+        
+        QTimer.singleShot(0, self.start_initial_loading)
+    
+    def start_initial_loading(self):
+        self.load_programs_data()
+        self.check_for_updates()
+    
+    def check_for_updates(self):
+        self.update_checker = UpdateChecker(self.update_url)
+        self.update_checker.update_available.connect(self.show_update_dialog)
+        self.update_checker.no_update.connect(self.on_no_update)
+        self.update_checker.check_failed.connect(self.on_update_check_failed)
+        self.update_checker.start()
+    
+    def load_programs_data(self):
+        self.statusBar().showMessage("Загрузка данных о программах...")
+        self.loading_progress.setValue(0)
+        
+        self.streamed_rows = 0
+        has_rows = self.apps_model.total_count() > 0
+        self.data_loader = DataLoader(self.programs_data_url, show_cached=not has_rows, stream_rows=not has_rows,
+                                      search_index=self.search_index,
+                                      base=list(self.apps_model.apps) if has_rows else None,
+                                      revision=self.catalog_revision if has_rows else None)
+        self.data_loader.data_loaded.connect(self.on_data_loaded)
+        self.data_loader.cache_loaded.connect(self.on_cache_loaded)
+        self.data_loader.rows_parsed.connect(self.on_rows_parsed)
+        self.data_loader.changes_loaded.connect(self.on_changes_loaded)
+        self.data_loader.revision_loaded.connect(self.on_revision_loaded)
+        self.data_loader.not_modified.connect(self.on_data_not_modified)
+        self.data_loader.index_ready.connect(self.on_index_ready)
+        self.data_loader.load_failed.connect(self.on_data_load_failed)
+        self.data_loader.progress_updated.connect(self.on_data_progress_updated)
+        self.data_loader.start()
+    
+    def on_data_progress_updated(self, progress, message):
+        self.loading_progress.setValue(progress)
+        self.status_label.setText(message)
+    
+    def init_ui(self):
+        self.setWindowTitle("Pidorlauncher")
+        self.setMinimumSize(900, 650)
+        
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        
+        self.downloads_panel = DownloadsPanel(self.download_manager, self)
+        self.addDockWidget(Qt.RightDockWidgetArea, self.downloads_panel)
+        self.downloads_panel.hide()
+        
+        self.create_toolbar()
+        self.network_debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.network_debug_shortcut.activated.connect(self.show_network_debug)
+        self.setStatusBar(QStatusBar())
+        
+        layout = QVBoxLayout()
+        layout.setContentsMargins(20, 10, 20, 20)
+        layout.setSpacing(15)
+        
+        title_label = QLabel("Доступно для загрузки:")
+        title_label.setFont(QFont("Arial", 20, QFont.Bold))
+        title_label.setAlignment(Qt.AlignCenter)
+        title_label.setStyleSheet("color: #2c3e50; margin: 10px;")
+        layout.addWidget(title_label)
+        
+        self.loading_progress = QProgressBar()
+        self.loading_progress.setRange(0, 100)
+        self.loading_progress.setValue(0)
+        self.loading_progress.setStyleSheet("""
+            QProgressBar {
+                border: 2px solid #bdc3c7;
+                border-radius: 5px;
+                text-align: center;
+                height: 20px;
+            }
+            QProgressBar::chunk {
+                background-color: #3498db;
+                width: 20px;
+            }
+        """)
+        layout.addWidget(self.loading_progress)
+        
+        self.status_label = QLabel("Минутку...")
+        self.status_label.setFont(QFont("Arial", 10))
+        self.status_label.setAlignment(Qt.AlignCenter)
+        self.status_label.setStyleSheet("color: #7f8c8d; padding: 8px;")
+        layout.addWidget(self.status_label)
+        
+        search_layout = QHBoxLayout()
+        
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("🔍 Поиск по названию, разработчику, описанию...")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumHeight(30)
+        self.search_edit.textChanged.connect(self.schedule_search)
+        search_layout.addWidget(self.search_edit, 1)
+        
+        self.developer_filter = QComboBox()
+        self.developer_filter.addItem("Все разработчики", "")
+        self.developer_filter.setMinimumWidth(160)
+        self.developer_filter.currentIndexChanged.connect(self.schedule_search)
+        search_layout.addWidget(self.developer_filter)
+        
+        self.category_filter = QComboBox()
+        self.category_filter.addItem("Все категории", "")
+        self.category_filter.setMinimumWidth(140)
+        self.category_filter.currentIndexChanged.connect(self.schedule_search)
+        self.category_filter.hide()
+        search_layout.addWidget(self.category_filter)
+        
+        layout.addLayout(search_layout)
+        
+        self.apps_list = QListView()
+        self.apps_list.setModel(self.apps_model)
+        self.apps_list.setItemDelegate(self.apps_delegate)
+        self.apps_list.setUniformItemSizes(True)
+        self.apps_list.setMouseTracking(True)
+        self.apps_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.apps_list.setEditTriggers(QListView.NoEditTriggers)
+        self.apps_list.doubleClicked.connect(self.on_app_double_clicked)
+        self.update_list_style()
+        layout.addWidget(self.apps_list)
+        
+        control_layout = QHBoxLayout()
+        
+        self.reload_btn = QPushButton("🔄 Обновить данные")
+        self.reload_btn.setFixedSize(150, 35)
+        self.reload_btn.setStyleSheet("""
+            QPushButton {
+                background: #3498db;
+                color: white;
+                border: none;
+                border-radius: 5px;
+                font-weight: bold;
+            }
+            QPushButton:hover {
+                background: #2980b9;
+            }
+        """)
+        self.reload_btn.clicked.connect(self.reload_data)
+        self.reload_btn.setEnabled(False)
+        
+        control_layout.addWidget(self.reload_btn)
+        control_layout.addStretch()
+        
+        layout.addLayout(control_layout)
+        
+        central_widget.setLayout(layout)
+    
+    def update_list_style(self):
+        self.apps_delegate.set_theme(self.current_theme)
+        if self.current_theme == "dark":
+            self.apps_list.setStyleSheet("""
+                QListView {
+                    background: #2d2d2d;
+                    border: 2px solid #555;
+                    border-radius: 8px;
+                    padding: 5px;
+                    color: white;
+                }
+            """)
+        else:
+            self.apps_list.setStyleSheet("""
+                QListView {
+                    background: white;
+                    border: 2px solid #bdc3c7;
+                    border-radius: 8px;
+                    padding: 5px;
+                }
+            """)
+        self.apps_list.viewport().update()
+    
+    def create_toolbar(self):
+        toolbar = QToolBar("Панель параметров")
+        toolbar.setIconSize(QSize(16, 16))
+        self.addToolBar(toolbar)
+        
+        theme_label = QLabel("Тема:")
+        toolbar.addWidget(theme_label)
+        
+        self.theme_combo = QComboBox()
+        self.theme_combo.addItems(["Светлая", "Темная"])
+        self.theme_combo.currentTextChanged.connect(self.change_theme)
+        toolbar.addWidget(self.theme_combo)
+        
+        toolbar.addSeparator()
+        
+        bandwidth_label = QLabel("Скорость:")
+        toolbar.addWidget(bandwidth_label)
+        
+        self.bandwidth_combo = QComboBox()
+        for limit_kb in self.BANDWIDTH_LIMITS_KB:
+            self.bandwidth_combo.addItem(self.bandwidth_limit_text(limit_kb), limit_kb)
+        index = self.bandwidth_combo.findData(self.bandwidth_limit_kb)
+        if index < 0:
+            self.bandwidth_combo.addItem(self.bandwidth_limit_text(self.bandwidth_limit_kb), self.bandwidth_limit_kb)
+            index = self.bandwidth_combo.count() - 1
+        self.bandwidth_combo.setCurrentIndex(index)
+        self.bandwidth_combo.currentIndexChanged.connect(self.change_bandwidth_limit)
+        toolbar.addWidget(self.bandwidth_combo)
+        
+        toolbar.addSeparator()
+        
+        refresh_action = QAction("🔄 Обновить", self)
+        refresh_action.triggered.connect(self.reload_data)
+        toolbar.addAction(refresh_action)
+        
+        downloads_action = self.downloads_panel.toggleViewAction()
+        downloads_action.setText("⬇ Загрузки")
+        toolbar.addAction(downloads_action)
+    
+    def bandwidth_limit_text(self, limit_kb):
+        if limit_kb <= 0:
+            return "Без ограничений"
+        return f"{format_file_size(limit_kb * 1024)}/с"
+    
+    def change_bandwidth_limit(self, index):
+        self.bandwidth_limit_kb = self.bandwidth_combo.itemData(index)
+        BandwidthScheduler.shared().set_limit(self.bandwidth_limit_kb * 1024)
+        self.settings.setValue("network/bandwidth_limit_kb", self.bandwidth_limit_kb)
+    
+    def change_theme(self, theme_name):
+        app = QApplication.instance()
+        if theme_name == "Темная":
+            ThemeManager.apply_dark_theme(app)
+            self.current_theme = "dark"
+        else:
+            ThemeManager.apply_light_theme(app)
+            self.current_theme = "light"
+        self.update_list_style()
+    
+    def on_data_loaded(self, programs_data):
+        try:
+            if not programs_data:
+                self.show_error("Нет данных о программах для отображения")
+                return
+                
+            if self.streamed_rows != len(programs_data):
+                self.populate_apps_list(programs_data)
+            self.size_service.prefetch(programs_data)
+            self.metrics.mark('catalog_loaded')
+            self.status_label.setText(f"Полученно {len(programs_data)} приложений\n Созданно GovNo corp. Версия: 1.5R")
+            self.loading_progress.setValue(100)
+            self.statusBar().showMessage(f"Загружено {len(programs_data)} приложений", 3000)
+            self.reload_btn.setEnabled(True)
+            
+        except Exception as e:
+            self.show_error(f"Ошибка обработки данных: {str(e)}")
+    
+    def on_cache_loaded(self, programs_data):
+        self.populate_apps_list(programs_data)
+        self.size_service.prefetch(programs_data)
+        self.status_label.setText(f"Показано {len(programs_data)} сохранённых приложений, проверяем обновления...")
+        self.reload_btn.setEnabled(True)
+    
+    def on_changes_loaded(self, changes):
+        self.apps_model.apply_changes(changes)
+        self.load_icons_async([app for index, app in changes.updated] + changes.added)
+        self.size_service.prefetch(changes.programs)
+        self.metrics.mark('catalog_loaded')
+        total = self.apps_model.total_count()
+        self.status_label.setText(f"Полученно {total} приложений\n Созданно GovNo corp. Версия: 1.5R")
+        self.loading_progress.setValue(100)
+        self.statusBar().showMessage(f"Каталог обновлён: добавлено {len(changes.added)}, "
+                                     f"изменено {len(changes.updated)}, удалено {len(changes.removed)}", 3000)
+        self.reload_btn.setEnabled(True)
+
+    def on_revision_loaded(self, revision):
+        self.catalog_revision = revision
+
+    def on_data_not_modified(self):
+        self.metrics.mark('catalog_loaded')
+        self.status_label.setText(f"Полученно {self.apps_model.total_count()} приложений\n Созданно GovNo corp. Версия: 1.5R")
+        self.loading_progress.setValue(100)
+        self.statusBar().showMessage("Список программ не изменился", 3000)
+        self.reload_btn.setEnabled(True)
+    
+    def on_rows_parsed(self, rows):
+        if self.streamed_rows == 0:
+            self.clear_apps_list()
+        
+        self.apps_model.append_apps(rows)
+        self.streamed_rows += len(rows)
+        self.metrics.mark('first_row')
+        self.load_icons_async(rows)
+    
+    def populate_apps_list(self, programs_data):
+        self.icon_loader.cancel_all()
+        self.apps_model.set_apps(programs_data)
+        if programs_data:
+            self.metrics.mark('first_row')
+        self.load_icons_async(programs_data)
+    
+    def schedule_search(self, *args):
+        self.search_timer.start()
+    
+    def on_index_ready(self, generation):
+        self.search_generation = generation
+        self.refresh_facets(self.developer_filter, 'developer', "Все разработчики")
+        self.refresh_facets(self.category_filter, 'category', "Все категории")
+        self.apply_search()
+    
+    def refresh_facets(self, combo, name, all_text):
+        current = combo.currentData()
+        values = self.search_index.facet_values(name)
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem(all_text, "")
+        for value, count in values:
+            combo.addItem(f"{value} ({count})", value)
+        combo.setCurrentIndex(max(0, combo.findData(current)))
+        combo.blockSignals(False)
+        combo.setVisible(bool(values))
+    
+    def apply_search(self):
+        if self.search_generation != self.search_index.generation:
+            return
+        self.search_request += 1
+        self.search_worker.request(self.search_request, self.search_edit.text(), {
+            'developer': self.developer_filter.currentData(),
+            'category': self.category_filter.currentData(),
+        })
+
+    def on_search_results(self, request_id, generation, rows):
+        if request_id != self.search_request or generation != self.search_generation:
+            return
+        
+        self.apps_model.set_filter(rows)
+        if rows is None:
+            self.statusBar().clearMessage()
+        else:
+            self.statusBar().showMessage(f"Найдено {len(rows)} из {self.apps_model.total_count()} приложений")
+    
+    def load_icons_async(self, apps):
+        for app in apps:
+            icon_url = app.get('icon_url')
+            if icon_url:
+                self.icon_loader.request(icon_url, icon_url, IconLoader.PRIORITY_BACKGROUND)
+    
+    def on_icon_requested(self, icon_url):
+        self.icon_loader.request(icon_url, icon_url, IconLoader.PRIORITY_VISIBLE)
+    
+    def on_icon_ready(self, icon_url, pixmap):
+        self.apps_model.set_icon(icon_url, pixmap)
+    
+    def on_icon_failed(self, icon_url, error_msg):
+        NetworkTracer.shared().failure(icon_url, f"Ошибка загрузки иконки {icon_url}: {error_msg}")
+    
+    def clear_apps_list(self):
+        self.icon_loader.cancel_all()
+        self.apps_model.clear()
+    
+    def on_data_load_failed(self, error_msg):
+        if self.apps_model.total_count() > 0:
+            NetworkTracer.shared().failure(self.programs_data_url, f"Ошибка загрузки данных: {error_msg}")
+            self.status_label.setText(f"Сервер недоступен, показано {self.apps_model.total_count()} сохранённых приложений")
+            self.loading_progress.setValue(100)
+            self.statusBar().showMessage("Не удалось обновить список программ", 5000)
+            self.reload_btn.setEnabled(True)
+            return
+        
+        self.show_error(f"Не удалось загрузить данные: {error_msg}")
+        self.status_label.setText("❌ Ошибка загрузки данных")
+        self.loading_progress.setValue(0)
+        self.statusBar().showMessage("Ошибка загрузки данных", 5000)
+        self.reload_btn.setEnabled(True)
+    
+    def show_update_dialog(self, update_data):
+        self.metrics.mark('update_check')
+        QTimer.singleShot(100, lambda: self._show_update_dialog(update_data))
+    
+    def _show_update_dialog(self, update_data):
+        from dialogs import UpdateDialog
+        dialog = UpdateDialog(update_data, self)
+        dialog.setModal(False)
+        dialog.show()
+    
+    def on_no_update(self):
+        self.metrics.mark('update_check')
+        self.statusBar().showMessage("Приложение обновлено", 2000)
+    
+    def on_update_check_failed(self, error_msg):
+        self.metrics.mark('update_check')
+        NetworkTracer.shared().failure(self.update_url, f"Ошибка проверки обновлений: {error_msg}")
+        self.statusBar().showMessage("Не удалось проверить обновления", 3000)
+    
+    def reload_data(self):
+        if self.data_loader.isRunning():
+            return
+        self.status_label.setText("Обновление данных...")
+        self.loading_progress.setValue(0)
+        self.reload_btn.setEnabled(False)
+        self.load_programs_data()
+        self.check_for_updates()
+    
+    def show_error(self, message):
+        QMessageBox.critical(self, "Ошибка", message)
+    
+    def on_app_double_clicked(self, index):
+        self.current_app_data = index.data(CatalogModel.AppDataRole)
+        
+        if not self.current_app_data.get('name'):
+            self.show_error("У приложения отсутствует название")
+            return
+        
+        if not self.current_app_data.get('download_url'):
+            self.show_error("У приложения отсутствует ссылка для скачивания")
+            return
+            
+        self.show_app_details()
+    
+    def show_app_details(self):
+        if hasattr(self, 'current_app_data'):
+            from dialogs import AppDetailsDialog
+            dialog = AppDetailsDialog(self.current_app_data, self)
+            dialog.exec_()
+    
+    def show_network_debug(self):
+        from dialogs import NetworkDebugWindow
+        if getattr(self, 'network_debug_window', None) is None:
+            self.network_debug_window = NetworkDebugWindow(self)
+        self.network_debug_window.show()
+        self.network_debug_window.raise_()
+        self.network_debug_window.force_refresh()
+    
+    def enqueue_download(self, app_data):
+        job = self.download_manager.enqueue(app_data)
+        self.downloads_panel.show()
+        self.downloads_panel.raise_()
+        if job.app_data is app_data:
+            self.statusBar().showMessage(f"Добавлено в загрузки: {app_data['name']}", 3000)
+        else:
+            self.statusBar().showMessage(f"Уже в загрузках: {job.name}", 3000)
+
+    def on_download_finished(self, job):
+        self.statusBar().showMessage(f"Загружено: {job.name} → {job.save_path}", 5000)
+
+    def closeEvent(self, event):
+        if self.download_manager.has_active_jobs():
+            reply = QMessageBox.question(
+                self, "Загрузки",
+                "Есть незавершённые загрузки. Выйти? Скачанные части сохранятся, и загрузку можно будет продолжить.",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+            if reply != QMessageBox.Yes:
+                event.ignore()
+                return
+        self.download_manager.shutdown()
+        self.search_worker.stop()
+        self.media_cache.save_index(force=True)
+        event.accept()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.metrics.mark('first_paint')
+
+def create_splash():
+    pixmap = QPixmap(360, 180)
+    pixmap.fill(QColor("#2c3e50"))
+    painter = QPainter(pixmap)
+    icon = QPixmap(str(install_dir() / "pidorlauncher.png"))
+    if not icon.isNull():
+        painter.drawPixmap(24, 58, icon.scaled(64, 64, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+    painter.setPen(QColor("white"))
+    painter.setFont(QFont("Arial", 20, QFont.Bold))
+    painter.drawText(QRect(104, 50, 240, 40), Qt.AlignLeft | Qt.AlignVCenter, "Pidorlauncher")
+    painter.setFont(QFont("Arial", 10))
+    painter.drawText(QRect(104, 90, 240, 24), Qt.AlignLeft | Qt.AlignVCenter, f"версия {APP_VERSION}")
+    painter.end()
+
+    splash = QSplashScreen(pixmap)
+    splash.showMessage("Загрузка...", Qt.AlignBottom | Qt.AlignHCenter, QColor("#bdc3c7"))
+    return splash
+
+def main(started=None):
+    metrics = StartupMetrics(started)
+    metrics.mark('imports')
+    startup_report = '--startup-report' in sys.argv
+    argv = [arg for arg in sys.argv if arg != '--startup-report']
+
+    app = QApplication(argv)
+    metrics.mark('app_created')
+    splash = create_splash()
+    splash.show()
+    app.processEvents()
+    metrics.mark('splash_shown')
+
+    QPixmapCache.setCacheLimit(64 * 1024)
+    ThemeManager.apply_light_theme(app)
+    
+    window = SoftwareDownloaderApp(metrics)
+    metrics.mark('window_constructed')
+    if startup_report:
+        metrics.on_first_paint = lambda: QTimer.singleShot(0, lambda: finish_startup_report(metrics))
+    window.show()
+    splash.finish(window)
+    
+    sys.exit(app.exec_())
+
+def finish_startup_report(metrics):
+    metrics.print_report()
+    sys.stderr.flush()
+    os._exit(1 if metrics.over_budget() else 0)
@@ -0,0 +1,66 @@
+import time
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from requests.adapters import HTTPAdapter
+from core import NetworkTracer
+
+class TracedConnectionMixin:
+    def _new_conn(self):
+        trace = NetworkTracer.shared().current()
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            if trace is not None:
+                trace.tcp += time.perf_counter() - started
+                trace.connections += 1
+
+    def connect(self):
+        trace = NetworkTracer.shared().current()
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            if trace is not None:
+                trace.handshake += time.perf_counter() - started
+
+    def request(self, *args, **kwargs):
+        trace = NetworkTracer.shared().current()
+        started = time.perf_counter()
+        super().request(*args, **kwargs)
+        if trace is not None:
+            trace.sent = time.perf_counter()
+            trace.send += trace.sent - started
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        trace = NetworkTracer.shared().current()
+        if trace is not None:
+            trace.headers_received = time.perf_counter()
+        return response
+
+class TracedHTTPConnection(TracedConnectionMixin, HTTPConnection):
+    pass
+
+class TracedHTTPSConnection(TracedConnectionMixin, HTTPSConnection):
+    pass
+
+class TracedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TracedHTTPConnection
+
+class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TracedHTTPSConnection
+
+class TracingAdapter(HTTPAdapter):
+    POOL_CLASSES = {'http': TracedHTTPConnectionPool, 'https': TracedHTTPSConnectionPool}
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.POOL_CLASSES
+
+    def build_response(self, req, resp):
+        tracer = NetworkTracer.shared()
+        trace = tracer.current()
+        if trace is not None:
+            tracer.watch(trace, resp)
+        return super().build_response(req, resp)